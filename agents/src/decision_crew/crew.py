@@ -1,8 +1,9 @@
 from agents.src.decision_crew.tools.custom_tool import (
     VideoEmbedTool, CogneeTool, ChunksTool, SummariesTool,
-    RAGCompletionTool, GraphCompletionTool
+    RAGCompletionTool, GraphCompletionTool, RetrieveAllTool
 )
-from crewai import Agent, Crew, Process, Task
+from agents.src.decision_crew.streaming import register_stream
+from crewai import Agent, Crew, LLM, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List, Dict
@@ -89,6 +90,18 @@ class DecisionCrew():
     agents: List[BaseAgent]
     tasks: List[Task]
 
+    def __init__(self, step_callback=None, stream_callback=None):
+        """
+        Args:
+            step_callback (callable, optional): Called with every agent step (e.g. a finished tool call).
+            stream_callback (callable, optional): Receives the report text as the reporting LLM streams it.
+        """
+        # Must be set here: CrewBase builds (and memoizes) the agents right after this __init__,
+        # setting the callbacks on the instance later would never reach reporting_analyst()
+        self.step_callback = step_callback
+        self.stream_callback = stream_callback
+        self.report_llm = None
+
     # -------------------
     # Agents
     # -------------------
@@ -101,6 +114,7 @@ class DecisionCrew():
             config=self.agents_config['researcher'],
             verbose=True,
             tools=[
+                RetrieveAllTool(),
                 VideoEmbedTool(),
                 ChunksTool(),
                 SummariesTool(),
@@ -112,9 +126,20 @@ class DecisionCrew():
     @agent
     def reporting_analyst(self) -> Agent:
         """Reporting agent that compiles research findings into a structured report."""
+        config = self.agents_config['reporting_analyst']
+        if self.stream_callback is None:
+            return Agent(
+                # Config from external YAML/JSON
+                config=config,
+                verbose=True
+            )
+
+        # Streaming LLM, its chunks are forwarded to stream_callback
+        self.report_llm = LLM(model=config['llm'], stream=True)
+        register_stream(self.report_llm, self.stream_callback)
         return Agent(
-            # Config from external YAML/JSON
-            config=self.agents_config['reporting_analyst'],
+            config=config,
+            llm=self.report_llm,
             verbose=True
         )
 
@@ -151,5 +176,6 @@ class DecisionCrew():
             tasks=self.tasks,    # Tasks created by @task decorators
             process=Process.sequential,  # Tasks executed sequentially
             verbose=True,
+            step_callback=self.step_callback,
             # Alternative: Process.hierarchical for different task orchestration
         )
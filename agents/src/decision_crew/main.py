@@ -6,6 +6,8 @@ import warnings
 from datetime import datetime
 
 from agents.src.decision_crew.crew import DecisionCrew
+from agents.src.decision_crew.streaming import unregister_stream
+from agents.src.decision_crew.tools.event_loop import start_warm_up
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -15,16 +17,25 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # interpolate any tasks and agents information
 
 
-def run(query) -> str:
+def run(query, step_callback=None, stream_callback=None) -> str:
     """
     Run the crew.
+
+    step_callback(step) is called after every agent step, stream_callback(text)
+    receives the report text while it is generated.
     """
     inputs = {
         "query": query,
     }
 
+    # No-op after the first call; tools wait for nothing, the warm-up just runs ahead of them
+    start_warm_up()
+    decision_crew = DecisionCrew(step_callback=step_callback, stream_callback=stream_callback)
     try:
-        result = DecisionCrew().crew().kickoff(inputs=inputs)
+        result = decision_crew.crew().kickoff(inputs=inputs)
         return result.json_dict
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
+    finally:
+        if decision_crew.report_llm is not None:
+            unregister_stream(decision_crew.report_llm)
@@ -0,0 +1,105 @@
+import json
+import threading
+
+# The event bus moved between CrewAI releases
+try:
+    from crewai.events import crewai_event_bus, LLMStreamChunkEvent, LLMCallCompletedEvent
+except ImportError:
+    from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent, LLMCallCompletedEvent
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def sources_from_tool_output(output) -> list:
+    """
+    Extract video/image source dicts from the JSON output of a research tool.
+
+    Args:
+        output (str): Tool output, e.g. from VideoEmbedTool (a list of payloads)
+            or RetrieveAllTool (a bundle with a "videos" list).
+
+    Returns:
+        list[dict]: Sources with at least a "link" key, empty if the output has none.
+    """
+    try:
+        data = json.loads(output)
+    except (TypeError, ValueError):
+        return []
+
+    if isinstance(data, dict):
+        data = data.get("videos", [])
+    if not isinstance(data, list):
+        return []
+
+    sources = []
+    for item in data:
+        if isinstance(item, dict) and (item.get("link") or item.get("url")):
+            # Qdrant payloads use "url", report sources use "link"
+            sources.append({**item, "link": item.get("link") or item.get("url")})
+    return sources
+
+
+def sources_from_step(step) -> list:
+    """Extract sources from a CrewAI agent step, if it is a finished tool call."""
+    return sources_from_tool_output(getattr(step, "result", None))
+
+
+class ReportStream:
+    """
+    Collects the streamed chunks of one LLM and forwards the final answer text.
+
+    Only the text after "Final Answer:" of the agent's ReAct output is forwarded,
+    so thoughts and the later JSON conversion call are not shown to the user.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.buffer = ""
+        self.done = False
+
+    def feed(self, chunk: str):
+        if self.done or not chunk:
+            return
+        seen = FINAL_ANSWER_MARKER in self.buffer
+        self.buffer += chunk
+        if seen:
+            self.callback(chunk)
+        elif FINAL_ANSWER_MARKER in self.buffer:
+            self.callback(self.buffer.split(FINAL_ANSWER_MARKER, 1)[1].lstrip())
+
+    def complete(self):
+        # One LLM call ends per agent step; stop after the one that gave the final answer
+        if FINAL_ANSWER_MARKER in self.buffer:
+            self.done = True
+        else:
+            self.buffer = ""
+
+
+def register_stream(llm, callback):
+    """Forward the final answer chunks streamed by `llm` to `callback(text)`."""
+    with _streams_lock:
+        _streams[id(llm)] = ReportStream(callback)
+
+
+def unregister_stream(llm):
+    with _streams_lock:
+        _streams.pop(id(llm), None)
+
+
+# One global handler dispatches chunks to the stream of the LLM that produced them,
+# so concurrent chat sessions don't see each other's tokens
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _on_stream_chunk(source, event):
+    stream = _streams.get(id(source))
+    if stream is not None:
+        stream.feed(event.chunk)
+
+
+@crewai_event_bus.on(LLMCallCompletedEvent)
+def _on_call_completed(source, event):
+    stream = _streams.get(id(source))
+    if stream is not None:
+        stream.complete()
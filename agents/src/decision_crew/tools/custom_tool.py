@@ -2,8 +2,8 @@ from crewai.tools import BaseTool
 from typing import Type, List, Union
 from pydantic import BaseModel, Field
 import json
-from app.api.combine_output import RAGCompetionOutput, GraphCompletionOutput, ChunksOutput, SummariesOutput, VideoEmbedOutput
-import asyncio
+from app.api.combine_output import RAGCompetionOutput, GraphCompletionOutput, ChunksOutput, SummariesOutput, VideoEmbedOutput, RetrieveAllOutput
+from agents.src.decision_crew.tools.event_loop import run_async
 
 # =========================
 # Input Schemas (Pydantic models for validation)
@@ -46,6 +46,12 @@ class ChunksInput(BaseModel):
 class SummariesInput(BaseModel):
     query: str = Field(..., description="Text query to retrieve summaries.")
 
+# Input model for retrieving from all sources at once
+
+
+class RetrieveAllInput(BaseModel):
+    query: str = Field(..., description="Text query to search across all knowledge sources.")
+
 # Input model for choosing Cognee function
 
 
@@ -72,8 +78,8 @@ class GraphCompletionTool(BaseTool):
     args_schema: Type[BaseModel] = GraphCompletionInput
 
     def _run(self, query: str) -> str:
-        # Run graph completion asynchronously
-        return asyncio.run(GraphCompletionOutput(query))
+        # Run graph completion on the shared tool event loop
+        return run_async(GraphCompletionOutput(query))
 
 
 class ChunksTool(BaseTool):
@@ -87,7 +93,7 @@ class ChunksTool(BaseTool):
     args_schema: Type[BaseModel] = ChunksInput
 
     def _run(self, query: str) -> str:
-        return asyncio.run(ChunksOutput(query))
+        return run_async(ChunksOutput(query))
 
 
 class SummariesTool(BaseTool):
@@ -101,7 +107,7 @@ class SummariesTool(BaseTool):
     args_schema: Type[BaseModel] = SummariesInput
 
     def _run(self, query: str) -> str:
-        return asyncio.run(SummariesOutput(query))
+        return run_async(SummariesOutput(query))
 
 
 class RAGCompletionTool(BaseTool):
@@ -115,7 +121,7 @@ class RAGCompletionTool(BaseTool):
     args_schema: Type[BaseModel] = RAGCompletionInput
 
     def _run(self, query: str) -> str:
-        return asyncio.run(RAGCompetionOutput(query))
+        return run_async(RAGCompetionOutput(query))
 
 
 class VideoEmbedTool(BaseTool):
@@ -132,6 +138,22 @@ class VideoEmbedTool(BaseTool):
         return result
 
 
+class RetrieveAllTool(BaseTool):
+    """Tool that queries every knowledge source concurrently in one step."""
+    name: str = "Retrieve All Tool"
+    description: str = """
+    One-step retrieval across all knowledge sources.
+    Queries video segments, chunks, summaries, RAG completion and graph completion concurrently
+    under a shared deadline, and returns one merged, deduplicated evidence bundle
+    (videos, texts per source, and per-source timings). Sources that time out are skipped.
+    """
+    args_schema: Type[BaseModel] = RetrieveAllInput
+
+    def _run(self, query: str) -> str:
+        output = run_async(RetrieveAllOutput(query))
+        return json.dumps(output, ensure_ascii=False, indent=2)
+
+
 class CogneeTool(BaseTool):
     """Dispatcher tool for selecting different Cognee functions."""
     name: str = "Cognee Tool"
@@ -0,0 +1,99 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# Maximum time (seconds) a tool waits for its coroutine, 0 = no limit.
+# Above RETRIEVE_ALL_TIMEOUT, so the retrieve-all deadline fires first.
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", 120))
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the long-lived event loop shared by all tools, starting it on first use.
+
+    The loop runs forever in a daemon thread, so async clients created by Cognee
+    (database engines, HTTP connection pools) stay bound to one loop and survive
+    across tool calls instead of being torn down by `asyncio.run` each time.
+    """
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="tools-event-loop", daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+def run_async(coro, timeout: float = TOOL_TIMEOUT):
+    """
+    Run a coroutine on the shared tool event loop and wait for its result.
+
+    Safe to call from several threads at once: the coroutines run concurrently
+    on the shared loop, so parallel tool calls of one agent turn overlap.
+
+    Args:
+        coro (Coroutine): Coroutine to run.
+        timeout (float): Seconds to wait before giving up, 0 or None waits forever.
+
+    Returns:
+        Any: The coroutine's result.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    try:
+        return future.result(timeout=timeout or None)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
+
+_warm_up_future = None
+_warm_up_lock = threading.Lock()
+
+def start_warm_up():
+    """
+    Open the Cognee engines on the shared tool loop in the background, once per process.
+
+    Tools run their Cognee queries on this loop, so engines warmed up here are the
+    ones the first query uses. Does not block; check progress with `readiness`.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the `warm_up_cognee` status dict.
+    """
+    global _warm_up_future
+    with _warm_up_lock:
+        if _warm_up_future is None:
+            # Imported lazily, so importing the tools does not configure Cognee
+            from pipelines.cognee.runtime import warm_up_cognee
+
+            def report(future):
+                try:
+                    print(f"Cognee warm-up: {future.result()}")
+                except Exception as e:
+                    print(f"⚠️ Cognee warm-up gagal: {e}")
+
+            _warm_up_future = asyncio.run_coroutine_threadsafe(warm_up_cognee(), get_event_loop())
+            _warm_up_future.add_done_callback(report)
+    return _warm_up_future
+
+def readiness() -> dict:
+    """
+    Readiness of the tool backends, for health checks.
+
+    Returns:
+        dict: "ready" (all Cognee engines open) and "warm_up" (status dict, "running" or "not started").
+    """
+    from pipelines.cognee.runtime import is_cognee_ready
+
+    if _warm_up_future is None:
+        warm_up = "not started"
+    elif not _warm_up_future.done():
+        warm_up = "running"
+    else:
+        try:
+            warm_up = _warm_up_future.result()
+        except Exception as e:
+            warm_up = f"error: {e}"
+    return {"ready": is_cognee_ready(), "warm_up": warm_up}
@@ -0,0 +1,132 @@
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from pipelines.twelve_labs.inference import embed_text
+from pipelines.utils.kb_version import get_kb_version
+
+load_dotenv()
+
+# Semantic cache of end-to-end answers from summary_generation
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+ANSWER_CACHE_PATH = os.environ.get("ANSWER_CACHE_PATH", "data/registry/answer_cache.db")
+# Minimum cosine similarity between two queries to reuse an answer
+ANSWER_CACHE_THRESHOLD = float(os.environ.get("ANSWER_CACHE_THRESHOLD", 0.95))
+
+_lock = threading.Lock()
+
+def purge_stale_answers(version: int):
+    """Delete answers of knowledge base versions older than `version`; they can never be served again."""
+    if os.path.exists(ANSWER_CACHE_PATH):
+        conn = sqlite3.connect(ANSWER_CACHE_PATH)
+        try:
+            conn.execute("DELETE FROM answers WHERE kb_version < ?", (version,))
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass    # answers table not created yet
+        finally:
+            conn.close()
+
+def connect() -> sqlite3.Connection:
+    """Open the answer cache database, creating it if needed."""
+    os.makedirs(os.path.dirname(ANSWER_CACHE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(ANSWER_CACHE_PATH)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            query TEXT,
+            embedding TEXT,
+            report TEXT,
+            kb_version INTEGER,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn
+
+def lookup_answer(query: str, kb_version: int = None, threshold: float = ANSWER_CACHE_THRESHOLD):
+    """
+    Find a stored answer for a semantically similar earlier query.
+
+    Args:
+        query (str): Incoming user query.
+        kb_version (int, optional): Knowledge base version the query is answered for,
+            read with `get_kb_version` when the request starts. Defaults to the current version.
+        threshold (float): Minimum cosine similarity to count as the same question.
+
+    Returns:
+        dict | None: The stored ExecutiveReport dict, or None if there is no close enough answer.
+    """
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    if kb_version is None:
+        kb_version = get_kb_version()
+
+    try:
+        vector = np.asarray(embed_text(query), dtype=np.float32)
+    except Exception as e:
+        print(f"⚠️ Answer cache lookup skipped: {e}")
+        return None
+
+    with _lock:
+        conn = connect()
+        rows = conn.execute(
+            "SELECT id, query, embedding, report FROM answers WHERE kb_version = ?",
+            (kb_version,),
+        ).fetchall()
+        if not rows:
+            conn.close()
+            return None
+
+        # Cosine similarity against all answers of the current knowledge base version
+        matrix = np.asarray([json.loads(row[2]) for row in rows], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(vector) or 1.0)
+        scores = matrix @ vector / np.where(norms == 0, 1.0, norms)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            conn.close()
+            return None
+
+        conn.execute("UPDATE answers SET hits = hits + 1 WHERE id = ?", (rows[best][0],))
+        conn.commit()
+        conn.close()
+
+    print(f"✅ Answer cache hit ({scores[best]:.3f}) for '{query}' ~ '{rows[best][1]}'")
+    return json.loads(rows[best][3])
+
+def store_answer(query: str, report: dict, kb_version: int = None):
+    """
+    Store the answer of `query` for the knowledge base version it was generated from.
+
+    Args:
+        query (str): User query.
+        report (dict): ExecutiveReport dict produced for the query.
+        kb_version (int, optional): Version read before the answer was generated (the one
+            passed to `lookup_answer`). If an ingest finished in the meantime the answer
+            may miss the new data, so it is not stored. Defaults to the current version.
+    """
+    if not ANSWER_CACHE_ENABLED or not report:
+        return
+
+    try:
+        vector = embed_text(query)
+    except Exception as e:
+        print(f"⚠️ Answer cache store skipped: {e}")
+        return
+
+    with _lock:
+        version = get_kb_version()
+        if kb_version is not None and kb_version != version:
+            print(f"⚠️ Answer cache store skipped: knowledge base changed (v{kb_version} -> v{version})")
+            return
+        conn = connect()
+        conn.execute(
+            "INSERT INTO answers (query, embedding, report, kb_version) VALUES (?, ?, ?, ?)",
+            (query, json.dumps(vector), json.dumps(report, ensure_ascii=False), version),
+        )
+        conn.commit()
+        conn.close()
+        # Pipelines bump the version without touching this cache, drop their stale answers here
+        purge_stale_answers(version)
@@ -1,9 +1,71 @@
+import queue
+import threading
 from agents.src.decision_crew import main as decision_crew_main
+from agents.src.decision_crew.streaming import sources_from_step
+from app.api.answer_cache import lookup_answer, store_answer
+from pipelines.utils.kb_version import get_kb_version
 
 
-def summary_generation(query="arsitektur dan organisasi komputer"):
+def summary_generation(query="arsitektur dan organisasi komputer", use_cache=True):
+    # reuse the answer of a semantically similar earlier query, if the knowledge base is unchanged
+    kb_version = get_kb_version()
+    if use_cache:
+        cached = lookup_answer(query, kb_version)
+        if cached is not None:
+            return cached
+
     result = decision_crew_main.run(query)
+    if use_cache:
+        store_answer(query, result, kb_version)
     return result
 
 
-# backend code
+def summary_generation_stream(query="arsitektur dan organisasi komputer", use_cache=True):
+    """
+    Streaming variant of `summary_generation`.
+
+    Runs the crew in a background thread and yields events as soon as they happen:
+    - ("sources", list[dict]): video/image sources returned by a research tool call
+    - ("token", str): the next piece of report text
+    - ("report", dict): the final ExecutiveReport, always the last event
+
+    Raises:
+        Exception: If the crew fails.
+    """
+    kb_version = get_kb_version()
+    if use_cache:
+        cached = lookup_answer(query, kb_version)
+        if cached is not None:
+            yield "report", cached
+            return
+
+    events = queue.Queue()
+
+    def on_step(step):
+        sources = sources_from_step(step)
+        if sources:
+            events.put(("sources", sources))
+
+    def worker():
+        try:
+            result = decision_crew_main.run(
+                query,
+                step_callback=on_step,
+                stream_callback=lambda text: events.put(("token", text)),
+            )
+            events.put(("report", result))
+        except Exception as e:
+            events.put(("error", e))
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    while True:
+        kind, value = events.get()
+        if kind == "error":
+            raise value
+        if kind == "report":
+            if use_cache:
+                store_answer(query, value, kb_version)
+            yield kind, value
+            return
+        yield kind, value
@@ -1,10 +1,15 @@
 import os
+import time
+import asyncio
 from pipelines.cognee.inference import query_cognee
 from cognee import SearchType
 from pipelines.twelve_labs.inference import query_twelve_labs
 
 from typing import List
 
+# Shared deadline (seconds) for all sources queried by RetrieveAllOutput
+RETRIEVE_ALL_TIMEOUT = float(os.getenv("RETRIEVE_ALL_TIMEOUT", 60))
+
 
 # Function to query Cognee with RAG (Retrieval-Augmented Generation) Completion
 # Returns a text-based answer generated from knowledge retrieval + LLM completion
@@ -37,7 +42,80 @@ async def SummariesOutput(query: str) -> str:
 # Function to query Twelve Labs API for video embeddings
 # Takes a text query and retrieves relevant video segments as embeddings
 # Returns a list of dictionaries containing video metadata and matches
-def VideoEmbedOutput(query: str) -> List[dict]:
+# Optional filters (video url(s), time range, embedding option) are passed to query_twelve_labs
+def VideoEmbedOutput(query: str, **filters) -> List[dict]:
     results = query_twelve_labs(
-        query_text=query, collection_name=os.getenv("TWELVE_LABS_COLLECTION"))
+        query_text=query, collection_name=os.getenv("TWELVE_LABS_COLLECTION"), **filters)
     return results
+
+
+# Run one retrieval source and record its status and latency
+async def _timed_source(name: str, coro, timings: dict):
+    start = time.perf_counter()
+    try:
+        result = await coro
+        timings[name] = {"status": "ok", "seconds": round(time.perf_counter() - start, 3)}
+        return result
+    except asyncio.CancelledError:
+        timings[name] = {"status": "timeout", "seconds": round(time.perf_counter() - start, 3)}
+        raise
+    except Exception as e:
+        timings[name] = {"status": f"error: {e}", "seconds": round(time.perf_counter() - start, 3)}
+        return None
+
+
+# Function to query all knowledge sources at once (Qdrant video segments + Cognee search types)
+# Sources run concurrently under one shared deadline; sources that time out or fail are skipped
+# Returns one merged, deduplicated evidence bundle with per-source timings
+async def RetrieveAllOutput(query: str, timeout: float = RETRIEVE_ALL_TIMEOUT) -> dict:
+    timings = {}
+    sources = {
+        "video": asyncio.to_thread(VideoEmbedOutput, query),
+        "chunks": ChunksOutput(query),
+        "summaries": SummariesOutput(query),
+        "rag_completion": RAGCompetionOutput(query),
+        "graph_completion": GraphCompletionOutput(query),
+    }
+    tasks = {
+        name: asyncio.create_task(_timed_source(name, coro, timings))
+        for name, coro in sources.items()
+    }
+
+    # Wait for all sources until the shared deadline, then drop the slow ones
+    _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    # Merge video segments, deduplicated by url + time range
+    videos, seen_segments = [], set()
+    video_task = tasks["video"]
+    for payload in (video_task.result() if video_task.done() and not video_task.cancelled() else None) or []:
+        key = (payload.get("url"), payload.get("start_offset_sec"), payload.get("end_offset_sec"))
+        if key not in seen_segments:
+            seen_segments.add(key)
+            videos.append(payload)
+
+    # Merge Cognee texts, deduplicated line by line across search types
+    texts, seen_lines = [], set()
+    for name, task in tasks.items():
+        if name == "video" or not task.done() or task.cancelled():
+            continue
+        result = task.result()
+        if not result or result == "text not found":
+            continue
+        lines = []
+        for line in result.split("\n"):
+            normalized = " ".join(line.split()).lower()
+            if normalized and normalized not in seen_lines:
+                seen_lines.add(normalized)
+                lines.append(line.strip())
+        if lines:
+            texts.append({"source": name, "text": "\n".join(lines)})
+
+    return {
+        "query": query,
+        "videos": videos,
+        "texts": texts,
+        "timings": timings,
+    }
@@ -6,11 +6,11 @@ import os
 import uuid
 import shutil
 import io
-from google.cloud import storage
 
-from pipelines.cognee.utils.upload_to_gcs import upload_file
+from pipelines.cognee.utils.upload_to_gcs import upload_file, upload_files, get_client
 from pipelines.cognee.main import pipeline_cognee
 from pipelines.twelve_labs.main import pipeline_twelvelabs
+from pipelines.utils.kb_version import bump_kb_version
 from pipelines.cognee.create_knowledge_img import create_knowledge_from_image
 from pipelines.cognee.utils.describe_image_llm import describe_image_llm
 
@@ -41,18 +41,16 @@ async def process_pdf(files, job_id, job_dir):
     os.makedirs(raw_dir, exist_ok=True)
     os.makedirs(clean_dir, exist_ok=True)
 
-    # gcs url data
-    gcs_urls = []
-
+    uploads = []
     for file in files:
         # save local
         filename = os.path.basename(file.name)
         local_path = os.path.join(raw_dir, filename)
         shutil.copy(file.name, local_path)
+        uploads.append((local_path, f"pdfs/{job_id}/{filename}", "application/pdf"))
 
-        # upload to gcs
-        gcs_url = upload_file(local_path, BUCKET_NAME, f"pdfs/{job_id}/{filename}", content_type="application/pdf")
-        gcs_urls.append(gcs_url)
+    # upload all pdfs to gcs concurrently
+    gcs_urls = upload_files(uploads, BUCKET_NAME)
 
     # cognee pipeline with upload metadata to gcs
     await pipeline_cognee(raw_dir, clean_dir, reset_data=False, upload_metadata=True, job_id=job_id)
@@ -70,20 +68,25 @@ async def process_images(files, job_id, job_dir):
     img_dir = os.path.join(job_dir, "images")
     os.makedirs(img_dir, exist_ok=True)
 
-    gcs_urls = []
+    uploads = []
     for file in files:
         # save local
         filename = os.path.basename(file.name)
         local_path = os.path.join(img_dir, filename)
         shutil.copy(file.name, local_path)
+        uploads.append((local_path, f"images/{job_id}/{filename}", "image/jpeg"))
 
-        # upload to gcs
-        gcs_url = upload_file(local_path, BUCKET_NAME, f"images/{job_id}/{filename}", content_type="image/jpeg")
-        gcs_urls.append(gcs_url)
+    # upload all images to gcs concurrently
+    gcs_urls = upload_files(uploads, BUCKET_NAME)
 
-        # create knowledge base using cognee use the local path of the image
+    for gcs_url in gcs_urls:
+        # create knowledge base using cognee use the gcs url of the image
         await create_knowledge_from_image(gcs_url)
 
+    # knowledge base changed: cached answers are no longer valid
+    # (the PDF and video pipelines bump the version themselves)
+    bump_kb_version(job_id)
+
     return gcs_urls
 
 def process_video(files, job_id, job_dir):
@@ -178,8 +181,8 @@ def handle_uploaded_image(img, session_id):
     img.save(buffer, format="PNG")
     buffer.seek(0)
 
-    # upload image to gcs temporary file
-    gcs_url = upload_file(buffer, BUCKET_NAME, f"chat_images/query_image.png", content_type="image/png")
+    # upload image to gcs under a content-addressed key, so concurrent queries don't overwrite each other
+    gcs_url = upload_file(buffer, BUCKET_NAME, f"chat_images/query_image.png", content_type="image/png", content_addressed=True)
 
     # query LLM to get image description
     desc = describe_image_llm(gcs_url)
@@ -190,8 +193,7 @@ def handle_uploaded_image(img, session_id):
 
 def list_files_in_gcs():
     """List PDF & Video files from GCS folders and return HTML string"""
-    client = storage.Client()
-    bucket = client.bucket(BUCKET_NAME)
+    bucket = get_client().bucket(BUCKET_NAME)
 
     # header + grid container
     html = """
@@ -1,10 +1,13 @@
+import os
 import gradio as gr
 import pandas as pd
 from app.client.db import init_db, get_all_sessions, create_new_session, get_session, update_session
 import sqlite3
 import datetime
-from app.api.combine import summary_generation
+from app.api.combine import summary_generation, summary_generation_stream
 from app.api.upload_data_pipeline import pipeline_process_files, handle_uploaded_image, list_files_in_gcs
+from agents.src.decision_crew.tools.event_loop import start_warm_up, readiness
+from pipelines.twelve_labs.main import resume_pending_jobs_in_background
 # from app.client.example import summary_generation
 MAX_VIDEOS = 5  # jumlah slot video yang kamu siapin
 
@@ -37,6 +40,45 @@ def display_video_from_url(video_url, start_time=3):
     return html_content
 
 
+def build_source_updates(vids):
+    """
+    Membuat update untuk slot video dan gambar dari daftar sumber (hasil tool atau report).
+    """
+    updates = []
+    # slot video
+    for i in range(MAX_VIDEOS):
+        if i < len(vids) and vids[i].get("embedding_scope", "") == "clip":
+            url = vids[i].get("link", "")
+            transcription = vids[i].get("transcription", "")
+            video = display_video_from_url(
+                url, start_time=vids[i].get("start_offset_sec", 0))
+            updates.append(
+                gr.update(value=video, visible=True))   # video
+            updates.append(
+                gr.update(value=f"**{transcription}**", visible=True))  # title
+        else:
+            updates.append(
+                gr.update(value=None, visible=False))  # video
+            updates.append(
+                gr.update(value="", visible=False))    # t
+
+    # slot gambar
+    for i in range(MAX_VIDEOS):
+        if i < len(vids) and vids[i].get("link", "").split('.')[-1] in ['png', 'jpg', 'jpeg'] and open_image(vids[i].get("link", "")) is not None:
+            url = vids[i].get("link", "")
+            transcription = vids[i].get("transcription", "")
+            updates.append(
+                gr.update(value=url, visible=True))   # image
+            updates.append(
+                gr.update(value=f"**{transcription}**", visible=True))  # title
+        else:
+            updates.append(
+                gr.update(value=None, visible=False))  # image
+            updates.append(
+                gr.update(value="", visible=False))    # t
+    return updates
+
+
 def process_files(files, session_id):
     if files is None:
         return None
@@ -239,46 +281,36 @@ def chat_page():
 
         # Event: Save Video Link
         def save_generate(session_id, msg):
+            # generator: Gradio renders every yield right away
+            no_change = [gr.update() for _ in source_container]
+            report_text = ""
+            sources, seen = [], set()
+            yield "⏳ Searching knowledge sources...", *build_source_updates([])
+
+            for kind, value in summary_generation_stream(msg):
+                if kind == "sources":
+                    # show retrieved clips/images as soon as a research tool returns
+                    for source in value:
+                        key = (source.get("link"), source.get("start_offset_sec"))
+                        if key not in seen:
+                            seen.add(key)
+                            sources.append(source)
+                    yield report_text or "⏳ Writing report...", *build_source_updates(sources)
+                elif kind == "token":
+                    # stream the report text, leave the source slots untouched
+                    report_text += value
+                    yield report_text, *no_change
+                elif kind == "report":
+                    result = value
 
-            result = summary_generation(msg)
             summary = result.get("report_title", "") + \
                 "\n" + result.get("summary", "")
             vids = result.get("lists", [])
             print("save generate link:", session_id, summary, vids)
-            updates = []
             if session_id:
                 update_session(session_id, msg,
                                summary=summary, video_link=vids)
-                # save video
-                for i in range(MAX_VIDEOS):
-                    if i < len(vids) and vids[i].get("embedding_scope", "") == "clip":
-                        url = vids[i].get("link", "")
-                        transcription = vids[i].get("transcription", "")
-                        updates.append(
-                            gr.update(value=url, visible=True))   # video
-                        updates.append(
-                            gr.update(value=f"**{transcription}**", visible=True))  # title
-                    else:
-                        updates.append(
-                            gr.update(value=None, visible=False))  # video
-                        updates.append(
-                            gr.update(value="", visible=False))    # t
-
-                # save gambar
-                for i in range(MAX_VIDEOS):
-                    if i < len(vids) and vids[i].get("link", "").split('.')[-1] in ['png', 'jpg', 'jpeg'] and open_image(vids[i].get("link", "")) is not None:
-                        url = vids[i].get("link", "")
-                        transcription = vids[i].get("transcription", "")
-                        updates.append(
-                            gr.update(value=url, visible=True))   # video
-                        updates.append(
-                            gr.update(value=f"**{transcription}**", visible=True))  # title
-                    else:
-                        updates.append(
-                            gr.update(value=None, visible=False))  # video
-                        updates.append(
-                            gr.update(value="", visible=False))    # t
-            return summary, *updates
+            yield summary, *build_source_updates(vids)
 
         msg.submit(save_generate, inputs=[
                    state_session_id, msg], outputs=[summary, *source_container])
@@ -304,6 +336,11 @@ def data_page():
 
 # Init DB
 init_db()
+# Open the Cognee engines in the background, so the first query does not pay the cold start
+start_warm_up()
+# Finish video ingests interrupted by a crash or restart of the previous run
+if os.getenv("RESUME_VIDEO_JOBS", "true").lower() in ("1", "true", "yes"):
+    resume_pending_jobs_in_background()
 
 # App
 with gr.Blocks() as demo:
@@ -313,4 +350,9 @@ with gr.Blocks() as demo:
         with gr.Tab("Data"):
             data_page()
 
+    # Readiness check for health probes, e.g. gradio_client.Client(url).predict(api_name="/health")
+    health_btn = gr.Button(visible=False)
+    health_output = gr.JSON(visible=False)
+    health_btn.click(readiness, inputs=None, outputs=health_output, api_name="health")
+
 demo.launch(server_name="0.0.0.0", server_port=7860, share=True)
@@ -0,0 +1,44 @@
+import sys
+import time
+import asyncio
+from cognee import SearchType
+from pipelines.cognee.inference import query_cognee
+from pipelines.cognee.runtime import warm_up_cognee
+
+async def benchmark_query(query: str, search_type=SearchType.CHUNKS, runs: int = 5, warm_up: bool = False) -> dict:
+    """
+    Measure first-query vs. steady-state latency of `query_cognee` in one process.
+
+    Args:
+        query (str): Query text to search for.
+        search_type (SearchType): Cognee search type to benchmark.
+        runs (int): Number of queries after the first one.
+        warm_up (bool): Open the Cognee engines with `warm_up_cognee` before the first query.
+
+    Returns:
+        dict: Warm-up status, first-query latency, and mean/max steady-state latency in seconds.
+    """
+    result = {"search_type": str(search_type)}
+    if warm_up:
+        result["warm_up"] = await warm_up_cognee()
+
+    start = time.perf_counter()
+    await query_cognee(query, search_type=search_type)
+    result["first_query_seconds"] = round(time.perf_counter() - start, 3)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await query_cognee(query, search_type=search_type)
+        timings.append(time.perf_counter() - start)
+
+    if timings:
+        result["steady_mean_seconds"] = round(sum(timings) / len(timings), 3)
+        result["steady_max_seconds"] = round(max(timings), 3)
+    return result
+
+
+if __name__ == "__main__":
+    # usage: python -m pipelines.cognee.benchmark_query "jelaskan System Interconnection" [--warm-up]
+    query = sys.argv[1] if len(sys.argv) > 1 else "jelaskan System Interconnection"
+    print(asyncio.run(benchmark_query(query, warm_up="--warm-up" in sys.argv)))
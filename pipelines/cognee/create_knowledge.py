@@ -10,8 +10,41 @@ from pipelines.cognee.utils.upload_to_gcs import upload_file
 from cognee import add, cognify
 
 BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME")
+# Number of slides added before one cognify run (0 = the whole upload job at once)
+COGNIFY_BATCH_SIZE = int(os.environ.get("COGNIFY_BATCH_SIZE", 64))
 
-async def create_knowledge(raw_dir, clean_dir, upload_metadata = False, job_id = None):
+async def cognify_batch(batch, registry):
+    """
+    Add a batch of slides to Cognee, run cognify once, and checkpoint the progress.
+
+    After the batch is cognified, its slide IDs are recorded in the registry entry
+    of their document, and documents whose slides are all cognified are marked
+    as done. The registry is saved, so a crash only loses the current batch.
+
+    Args:
+        batch (list[dict]): Slide metadata entries (with `doc_id`, `slide_id` and `text`).
+        registry (dict): Registry of processed documents, updated in place.
+    """
+    # create dataset for cognee
+    await add(data=[data["text"] for data in batch])
+    print(f"Add: Finish created dataset for {len(batch)} slides ({batch[0]['slide_id']} .. {batch[-1]['slide_id']})")
+    # create knowledge using cognee
+    await cognify()
+    print(f"Cognify: Finish created knowledge for {len(batch)} slides")
+
+    # checkpoint cognified slides
+    for data in batch:
+        registry[data["doc_id"]]["cognified_slides"].append(data["slide_id"])
+
+    for doc_id in {data["doc_id"] for data in batch}:
+        entry = registry[doc_id]
+        if len(entry["cognified_slides"]) >= entry["total_slides"]:
+            registry[doc_id] = {"metadata_file": entry["metadata_file"], "status": "done"}
+
+    save_registry(registry)
+
+
+async def create_knowledge(raw_dir, clean_dir, upload_metadata = False, job_id = None, batch_size = COGNIFY_BATCH_SIZE):
     """
     Process PDF documents to extract metadata, store knowledge, and update registry.
 
@@ -23,20 +56,25 @@ async def create_knowledge(raw_dir, clean_dir, upload_metadata = False, job_id =
        - Skip if it is already processed.
        - Load metadata if it exists in `clean_dir`, otherwise process the PDF to create metadata.
        - Optionally upload metadata to Google Cloud Storage (if `upload_metadata=True`).
-       - Send extracted text into Cognee (`add`) and generate knowledge (`cognify`).
-    4. Update the registry with the new document’s metadata file and processing status.
+       - Queue its slides for Cognee, skipping slides cognified by an earlier, interrupted run.
+    4. Send queued slides into Cognee (`add`) and generate knowledge (`cognify`) once per
+       `batch_size` slides, across documents, instead of once per slide.
+    5. Checkpoint every batch in the registry; a document is marked done when all its slides are cognified.
 
     Args:
         raw_dir (str): Path to the folder containing raw PDF files.
         clean_dir (str): Path to the folder where processed metadata should be stored.
         upload_metadata (bool, optional): Whether to upload metadata JSON to GCS. Defaults to False.
         job_id (str, optional): Job identifier for organizing uploads in GCS. Defaults to None.
+        batch_size (int, optional): Slides per cognify run; 0 runs cognify once for the whole job.
 
     Returns:
         None
     """
     # get json registry data
     registry = load_registry()
+    # slides waiting for the next cognify run
+    pending = []
 
     for filename in os.listdir(raw_dir):
         # get pdf file
@@ -48,7 +86,7 @@ async def create_knowledge(raw_dir, clean_dir, upload_metadata = False, job_id =
         doc_id = get_doc_id_from_filename(pdf_path)
         
         # check if file already processed or not
-        if doc_id in registry:
+        if registry.get(doc_id, {}).get("status") == "done":
             print(f"Skip {filename}, already processed")
             continue
         
@@ -77,20 +115,33 @@ async def create_knowledge(raw_dir, clean_dir, upload_metadata = False, job_id =
                 print(f"Failed {filename}: {e}")
                 continue
 
-        # create knowledge base
-        for data in metadata:
-            if data.get("text"):
-                # create dataset for cognee
-                await add(data=data['text'])
-                print(f"Add: Finish created dataset for {data['slide_id']}")
-                # create knowledge using cognee
-                await cognify()
-                print(f"Cognify: Finish created knowledge for {data['slide_id']}")
+        # resume from the last checkpoint of an interrupted run
+        slides = [dict(data, doc_id=doc_id) for data in metadata if data.get("text")]
+        cognified = registry.get(doc_id, {}).get("cognified_slides", [])
+        done_slides = set(cognified)
+        remaining = [data for data in slides if data["slide_id"] not in done_slides]
 
         # update registry
-        registry[doc_id] = {
-            "metadata_file": metadata_filename,
-            "status": "done"
-        }
+        if remaining:
+            registry[doc_id] = {
+                "metadata_file": metadata_filename,
+                "status": "processing",
+                "total_slides": len(slides),
+                "cognified_slides": list(cognified),
+            }
+        else:
+            registry[doc_id] = {
+                "metadata_file": metadata_filename,
+                "status": "done"
+            }
+        save_registry(registry)
+
+        # create knowledge base in batches
+        pending.extend(remaining)
+        while batch_size and len(pending) >= batch_size:
+            await cognify_batch(pending[:batch_size], registry)
+            pending = pending[batch_size:]
 
-        save_registry(registry)
\ No newline at end of file
+    # cognify the rest of the job
+    if pending:
+        await cognify_batch(pending, registry)
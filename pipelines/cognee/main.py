@@ -1,14 +1,12 @@
-import os
 import asyncio
-import pathlib
-from os import path
 from dotenv import load_dotenv
 load_dotenv()
-from cognee_community_vector_adapter_qdrant import register  # noqa: F401
-from cognee import config, prune
-from pipelines.cognee.create_knowledge import create_knowledge
+from cognee import prune
+from pipelines.cognee.runtime import configure_cognee
+from pipelines.cognee.create_knowledge import create_knowledge, COGNIFY_BATCH_SIZE
+from pipelines.utils.kb_version import bump_kb_version
 
-async def pipeline_cognee(raw_dir, clean_dir, reset_data=False, upload_metadata=False ,job_id=None):
+async def pipeline_cognee(raw_dir, clean_dir, reset_data=False, upload_metadata=False ,job_id=None, batch_size=COGNIFY_BATCH_SIZE):
     """
     Run the Cognee pipeline to process documents and create knowledge.
 
@@ -17,14 +15,15 @@ async def pipeline_cognee(raw_dir, clean_dir, reset_data=False, upload_metadata=
     PDF files into structured knowledge.
 
     Workflow:
-    1. Configure Cognee system root and data storage directories.
-    2. Set up database configurations:
+    1. Configure Cognee once per process (`pipelines.cognee.runtime.configure_cognee`):
        - Relational DB (SQLite by default).
        - Vector DB (Qdrant by default, configurable via environment variables).
        - Graph DB (provider configurable via environment variables).
-    3. If `reset_data=True`, clear stored data and metadata.
-    4. Call `create_knowledge` to process PDFs from `raw_dir` into `clean_dir`.
+    2. If `reset_data=True`, clear stored data and metadata.
+    3. Call `create_knowledge` to process PDFs from `raw_dir` into `clean_dir`.
        - Optionally uploads metadata to GCS if `upload_metadata=True`.
+       - Cognifies slides in batches of `batch_size` with checkpoints in the registry.
+    4. Bump the knowledge base version, so cached answers are not served anymore.
 
     Args:
         raw_dir (str): Directory containing raw PDF documents.
@@ -32,37 +31,13 @@ async def pipeline_cognee(raw_dir, clean_dir, reset_data=False, upload_metadata=
         reset_data (bool, optional): If True, wipes previous data and metadata before processing.
         upload_metadata (bool, optional): If True, uploads generated metadata JSON to GCS.
         job_id (str, optional): Job identifier for organizing metadata uploads in GCS.
+        batch_size (int, optional): Slides per cognify run; 0 runs cognify once for the whole job.
 
     Returns:
         None
     """
-    # Setup config Cognee
-    system_path = pathlib.Path(__file__).parent
-    config.system_root_directory(path.join(system_path, ".cognee_system"))
-    config.data_root_directory(path.join(system_path, ".data_storage"))
-
-    # Setup relational database
-    config.set_relational_db_config(
-        {
-            "db_provider": "sqlite",
-        }
-    )
-    
-    # Setup vector database
-    config.set_vector_db_config(
-        {
-            "vector_db_provider": os.getenv("VECTOR_DB_PROVIDER", "qdrant"),
-            "vector_db_url": os.getenv("VECTOR_DB_URL"),
-            "vector_db_key": os.getenv("VECTOR_DB_KEY", ""),
-        }
-    )
-
-    # Setup graph database
-    config.set_graph_db_config(
-        {
-            "graph_database_provider": os.getenv("GRAPH_DATABASE_PROVIDER"),
-        }
-    )
+    # Configure Cognee once per process
+    configure_cognee()
 
     # clear data
     if reset_data == True:
@@ -70,7 +45,10 @@ async def pipeline_cognee(raw_dir, clean_dir, reset_data=False, upload_metadata=
         await prune.prune_system(metadata=True)
 
     # create knowledge based on file at data/raw
-    await create_knowledge(raw_dir, clean_dir, upload_metadata=upload_metadata, job_id=job_id)
+    await create_knowledge(raw_dir, clean_dir, upload_metadata=upload_metadata, job_id=job_id, batch_size=batch_size)
+
+    # Knowledge base changed: answers cached for the previous version are stale
+    bump_kb_version(job_id)
 
 
 # if __name__ == "__main__":
@@ -1,8 +1,10 @@
 import os
 import json
 import fitz
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pipelines.cognee.utils.pdf_converter import convert_to_pdf
-from pipelines.cognee.utils.pipeline_utils import save_page_as_image, extract_text, clean_text, get_doc_id_from_filename
+from pipelines.cognee.utils.pipeline_utils import save_page_as_image, extract_text, clean_text, get_doc_id_from_filename, retry_with_backoff
 from pipelines.cognee.utils.upload_to_gcs import upload_file
 from pipelines.cognee.utils.extract_image_llm import query_slide_llm
 from dotenv import load_dotenv
@@ -12,8 +14,51 @@ load_dotenv()
 GCS_BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME")
 GCS_DEST_IMAGES_PATH = os.environ.get("GCS_DEST_IMAGES_PATH")
 # GCS_DEST_METADATA_PATH = os.environ.get("GCS_DEST_METADATA_PATH")
+# Maximum number of pages uploaded / analyzed by the LLM at the same time
+PAGE_MAX_IN_FLIGHT = int(os.environ.get("PAGE_MAX_IN_FLIGHT", 8))
 
-def process_document(input_file: str):
+def process_page(doc_id: str, page_num: int, extracted_text: str, img_buf) -> dict:
+    """
+    Upload a rendered page and refine its text with the LLM.
+
+    GCS uploads and LLM calls are retried with backoff on rate limits and
+    transient errors.
+
+    Args:
+        doc_id (str): Document identifier derived from filename.
+        page_num (int): Page number (0-based index).
+        extracted_text (str): Raw text extracted from the page.
+        img_buf (BytesIO): Rendered page image (JPEG).
+
+    Returns:
+        dict: Metadata of the page, see `process_document`.
+    """
+    slide_id = f"{doc_id}_{page_num}"
+
+    # Upload image buffer to GCS under a content-addressed key (re-ingested pages are not uploaded again)
+    gcs_blob_path = f"{GCS_DEST_IMAGES_PATH}/{slide_id}.jpg"
+    def upload_page():
+        img_buf.seek(0)  # rewind the buffer in case a previous attempt consumed it
+        return upload_file(img_buf, GCS_BUCKET_NAME, gcs_blob_path, content_type="image/jpeg", content_addressed=True)
+
+    gcs_url = retry_with_backoff(upload_page)
+
+    # Use LLM to validate/augment extracted text and describe images
+    llm_out = retry_with_backoff(query_slide_llm, gcs_url, extracted_text)
+
+    # Clean text (remove unwanted patterns, normalize spacing)
+    cleaned_text = clean_text(llm_out.get("final_text", extracted_text))
+
+    # Collect metadata for this slide/page
+    return {
+        "doc_id": doc_id,
+        "slide_id": slide_id,
+        "page_number": page_num + 1,
+        "gcs_url": gcs_url,
+        "text": cleaned_text + f" URL: {gcs_url}",
+    }
+
+def process_document(input_file: str, max_in_flight: int = PAGE_MAX_IN_FLIGHT):
     """
     Process a document (PDF, DOCX, PPTX) into structured slide/page metadata.
 
@@ -26,56 +71,56 @@ def process_document(input_file: str):
         6. Clean and normalize the final text.
         7. Store results as metadata for each slide/page.
 
+    Pages are rendered one by one (PyMuPDF is not thread-safe), while uploads and
+    LLM calls of up to `max_in_flight` pages overlap in a thread pool. Rendering
+    pauses when that many pages are in flight, so memory stays bounded.
+
     Args:
         input_file (str): Path to the input file (PDF, DOCX, PPTX).
+        max_in_flight (int): Maximum number of pages uploaded/analyzed concurrently.
 
     Returns:
-        list[dict]: A list of metadata dictionaries, where each entry contains:
+        list[dict]: A list of metadata dictionaries in page order, where each entry contains:
             - doc_id (str): Document identifier derived from filename.
             - slide_id (str): Unique slide/page identifier.
             - page_number (int): Page number (1-based index).
-            - gcs_url (str): Public URL of the uploaded slide image in GCS.
+            - gcs_url (str): Public URL of the uploaded slide image in GCS (content-addressed).
             - text (str): Cleaned text (OCR/LLM-enhanced).
     """
-    results = []
-
     # Ensure file is converted to PDF
     pdf_path = convert_to_pdf(input_file)
 
     # Open PDF with PyMuPDF
     doc = fitz.open(pdf_path)
     doc_id = get_doc_id_from_filename(input_file)
+    total_pages = len(doc)
 
-    # Iterate through all pages
-    for page_num, page in enumerate(doc):
-        slide_id = f"{doc_id}_{page_num}"
-
-        # Extract text from PDF page
-        extracted_text = extract_text(page)
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+    futures = []
 
-        # Render page as image (in-memory buffer)
-        img_buf = save_page_as_image(page)
+    def on_done(future):
+        in_flight.release()
+        if future.exception() is None:
+            result = future.result()
+            print(f"[{result['page_number']}/{total_pages}] slide {result['slide_id']}")
 
-        # Upload image buffer to GCS
-        gcs_blob_path = f"{GCS_DEST_IMAGES_PATH}/{slide_id}.jpg"
-        gcs_url = upload_file(img_buf, GCS_BUCKET_NAME, gcs_blob_path, content_type="image/jpeg")
+    try:
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            # Iterate through all pages
+            for page_num, page in enumerate(doc):
+                in_flight.acquire()
 
-        # Use LLM to validate/augment extracted text and describe images
-        llm_out = query_slide_llm(gcs_url, extracted_text)
+                # Extract text from PDF page and render it as image (in-memory buffer)
+                extracted_text = extract_text(page)
+                img_buf = save_page_as_image(page)
 
-        # Clean text (remove unwanted patterns, normalize spacing)
-        cleaned_text = clean_text(llm_out.get("final_text", extracted_text))
+                future = pool.submit(process_page, doc_id, page_num, extracted_text, img_buf)
+                future.add_done_callback(on_done)
+                futures.append(future)
 
-        # Collect metadata for this slide/page
-        metadata = {
-            "doc_id": doc_id,
-            "slide_id": slide_id,
-            "page_number": page_num + 1,
-            "gcs_url": gcs_url,
-            "text": cleaned_text + f" URL: {gcs_url}",
-        }
-        results.append(metadata)
-        print(f"[{page_num+1}/{len(doc)}] slide {slide_id}")
+            # Collect results in page order (raises the first page error)
+            results = [future.result() for future in futures]
+    finally:
+        doc.close()
 
-    doc.close()
-    return results
\ No newline at end of file
+    return results
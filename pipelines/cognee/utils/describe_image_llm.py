@@ -2,18 +2,25 @@ import os
 from dotenv import load_dotenv
 import json
 from openai import OpenAI
+from pipelines.cognee.utils.llm_cache import llm_cache, image_hash_from_url, make_cache_key
 
 load_dotenv()
 
 client = OpenAI(api_key=os.environ.get("LLM_API_KEY"))
 
-def describe_image_llm(gcs_url: str, model: str = "gpt-5-mini") -> str:
+def describe_image_llm(gcs_url: str, model: str = "gpt-5-mini", image_hash: str = None, use_cache: bool = True) -> str:
     """
     Generate a short description of an image using an LLM.
 
+    Responses are cached on disk, keyed on image content hash + prompt + model.
+    The hash is taken from `image_hash` or from a content-addressed URL; images
+    without a known hash are never cached.
+
     Args:
         gcs_url (str): The URL of the image (e.g., stored in GCS).
         model (str): The LLM model to use for image analysis.
+        image_hash (str, optional): SHA-256 of the image bytes.
+        use_cache (bool): Set to False to always call the LLM.
 
     Returns:
         str: A short description of the image in plain text.
@@ -27,7 +34,16 @@ def describe_image_llm(gcs_url: str, model: str = "gpt-5-mini") -> str:
         "Describe them in the same language as the text in the slide if available (ID/EN).\n"
         "If the image contains mathematical notations/symbols, use LaTeX format (e.g., notation for OR, AND, etc.).\n"
     )
-    
+    user_msg = "What's in this image"
+
+    # return cached description for the same image, prompt and model
+    image_hash = image_hash or image_hash_from_url(gcs_url)
+    cache_key = make_cache_key("describe_image", image_hash, system_msg_en, user_msg, model) if use_cache and image_hash else None
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     # call the LLM API for image description
     response = client.responses.create(
         model=model,
@@ -36,7 +52,7 @@ def describe_image_llm(gcs_url: str, model: str = "gpt-5-mini") -> str:
             {
                 "role": "user",
                 "content": [
-                    {"type": "input_text", "text": f"What's in this image"},
+                    {"type": "input_text", "text": user_msg},
                     {"type": "input_image", "image_url": gcs_url},
                 ],
             },
@@ -45,4 +61,6 @@ def describe_image_llm(gcs_url: str, model: str = "gpt-5-mini") -> str:
 
     # Extract the generated output as plain text
     content = response.output_text.strip()
+    if cache_key:
+        llm_cache.set(cache_key, content)
     return content
\ No newline at end of file
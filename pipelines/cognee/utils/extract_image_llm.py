@@ -2,19 +2,26 @@ import os
 from dotenv import load_dotenv
 import json
 from openai import OpenAI
+from pipelines.cognee.utils.llm_cache import llm_cache, image_hash_from_url, make_cache_key
 
 load_dotenv()
 
 client = OpenAI(api_key=os.environ.get("LLM_API_KEY"))
 
-def query_slide_llm(image_url: str, extracted_text: str, model: str = "gpt-5-mini") -> dict:
+def query_slide_llm(image_url: str, extracted_text: str, model: str = "gpt-5-mini", image_hash: str = None, use_cache: bool = True) -> dict:
     """
     Analyze a slide (page of a document) using an LLM with both image and text input.
 
+    Parsed responses are cached on disk, keyed on image content hash + prompt +
+    extracted text + model. The hash is taken from `image_hash` or from a
+    content-addressed URL; images without a known hash are never cached.
+
     Args:
         image_url (str): Public URL of the slide image (uploaded to GCS).
         extracted_text (str): Raw text extracted from the slide using OCR or PDF text extraction.
         model (str, optional): The LLM model name. Defaults to "gpt-5-mini".
+        image_hash (str, optional): SHA-256 of the image bytes.
+        use_cache (bool, optional): Set to False to always call the LLM.
 
     Returns:
         dict: JSON object containing:
@@ -60,6 +67,13 @@ def query_slide_llm(image_url: str, extracted_text: str, model: str = "gpt-5-min
         "   Remove duplicate sentences/ideas that appear more than once."
     )
 
+    # return cached analysis for the same image, prompt, text and model
+    image_hash = image_hash or image_hash_from_url(image_url)
+    cache_key = make_cache_key("query_slide", image_hash, system_msg, extracted_text, model) if use_cache and image_hash else None
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
     # Call the LLM API with both extracted text and image
     response = client.responses.create(
@@ -80,7 +94,11 @@ def query_slide_llm(image_url: str, extracted_text: str, model: str = "gpt-5-min
     content = response.output_text
     # Parse the output into JSON
     try:
-        return json.loads(content)
+        result = json.loads(content)
+        # only successfully parsed answers are cached
+        if cache_key:
+            llm_cache.set(cache_key, result)
+        return result
     except Exception:
         # Fallback: return a default structure if parsing fails
         return {
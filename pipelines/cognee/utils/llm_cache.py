@@ -0,0 +1,136 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Disk-backed cache of LLM responses for slide/image analysis
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "data/registry/llm_cache.db")
+# Maximum total size of cached responses, oldest entries are evicted first
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Content-addressed GCS objects end with their SHA-256 digest, e.g. clips/<sha256>.png
+CONTENT_HASH_PATTERN = re.compile(r"([0-9a-f]{64})\.[A-Za-z0-9]+$")
+
+def image_hash_from_url(url: str):
+    """
+    Get the content hash of an image from a content-addressed URL.
+
+    Args:
+        url (str): Image URL, e.g. returned by `upload_file(..., content_addressed=True)`.
+
+    Returns:
+        str | None: SHA-256 hex digest, or None if the URL is not content-addressed.
+    """
+    match = CONTENT_HASH_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+def make_cache_key(*parts) -> str:
+    """Build a cache key from the image hash, prompts, model name and any other inputs."""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """
+    Size-bounded LRU cache of JSON-serializable LLM responses stored in SQLite.
+
+    Entries are evicted by least recent access once the total stored size exceeds
+    `max_bytes`. Hit and miss counters are kept per process.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES, enabled: bool = LLM_CACHE_ENABLED):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the cache database, creating it on first use."""
+        if not self.initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if not self.initialized:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    size INTEGER,
+                    last_access REAL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            conn.commit()
+            self.initialized = True
+        return conn
+
+    def get(self, key: str):
+        """
+        Look up a cached response.
+
+        Returns:
+            Any | None: The cached value, or None on a miss or when the cache is disabled.
+        """
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            conn = self.connect()
+            row = conn.execute("SELECT value FROM llm_cache WHERE key=?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                conn.close()
+                return None
+
+            self.hits += 1
+            conn.execute("UPDATE llm_cache SET last_access=? WHERE key=?", (time.time(), key))
+            conn.commit()
+            conn.close()
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        """Store a response and evict the least recently used entries if the cache is too large."""
+        if not self.enabled:
+            return
+
+        data = json.dumps(value, ensure_ascii=False)
+        with self.lock:
+            conn = self.connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), time.time()),
+            )
+
+            # Evict the oldest entries until the cache fits in `max_bytes`
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total > self.max_bytes:
+                rows = conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall()
+                evict = []
+                for old_key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((old_key,))
+                    total -= size
+                conn.executemany("DELETE FROM llm_cache WHERE key=?", evict)
+            conn.commit()
+            conn.close()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters of this process and the number of stored entries."""
+        entries = 0
+        if self.enabled:
+            with self.lock:
+                conn = self.connect()
+                entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                conn.close()
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, "entries": entries}
+
+# Shared cache used by describe_image_llm and query_slide_llm
+llm_cache = LLMCache()
@@ -5,6 +5,7 @@ from io import BytesIO
 import os
 import re
 import hashlib
+from pipelines.utils.retry import retry_with_backoff, is_retryable_error, get_retry_after
 
 def gen_uuid() -> str:
     """
@@ -104,4 +105,4 @@ def get_doc_id_from_filename(file_path: str) -> str:
             h.update(chunk)
     content_hash = h.hexdigest()[:8]
 
-    return f"{base}_{content_hash}"
\ No newline at end of file
+    return f"{base}_{content_hash}"
@@ -1,50 +1,211 @@
 from google.cloud import storage
 import os
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from io import BytesIO
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 
 GCS_CRED_JSON = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+# Number of pooled HTTP connections kept open to GCS (also the default bulk upload concurrency)
+GCS_POOL_SIZE = int(os.environ.get("GCS_POOL_SIZE", 16))
+# Files at or above this size are streamed with a chunked resumable upload
+GCS_RESUMABLE_THRESHOLD = int(os.environ.get("GCS_RESUMABLE_THRESHOLD", 8 * 1024 * 1024))
+# Chunk size for resumable uploads, must be a multiple of 256 KB
+GCS_CHUNK_SIZE = int(os.environ.get("GCS_CHUNK_SIZE", 8 * 1024 * 1024))
 
-def upload_file(source, bucket_name: str, dest_path: str, content_type: str = None) -> str:
+# Local index of content-addressed objects already present in GCS
+GCS_INDEX_PATH = os.environ.get("GCS_INDEX_PATH", "data/registry/gcs_index.db")
+
+_client = None
+_client_lock = threading.Lock()
+_index_keys = None
+_index_lock = threading.Lock()
+
+def get_client() -> storage.Client:
+    """
+    Return the process-wide GCS client, creating it on first use.
+
+    The service account JSON is read only once, and the client's HTTP session is
+    mounted with a connection pool of `GCS_POOL_SIZE`, so concurrent uploads
+    reuse open connections instead of paying a new TLS handshake each time.
+
+    Returns:
+        storage.Client: Shared GCS client.
+
+    Notes:
+        - If GOOGLE_APPLICATION_CREDENTIALS is set, it uses that JSON key file.
+        - If not, it falls back to default GCP credentials (e.g., from environment).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Initialize GCS client (with explicit service account if provided)
+                if GCS_CRED_JSON:
+                    client_gcs = storage.Client.from_service_account_json(GCS_CRED_JSON)
+                else:
+                    client_gcs = storage.Client()
+
+                # Enlarge the HTTP connection pool for concurrent uploads
+                adapter = HTTPAdapter(pool_connections=GCS_POOL_SIZE, pool_maxsize=GCS_POOL_SIZE)
+                client_gcs._http.mount("https://", adapter)
+                _client = client_gcs
+    return _client
+
+def content_hash(source) -> str:
+    """
+    Compute the SHA-256 hex digest of a local file or in-memory buffer.
+
+    Args:
+        source (str | BytesIO): Local file path or buffer. The buffer position is not changed.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    h = hashlib.sha256()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                h.update(chunk)
+    elif isinstance(source, BytesIO):
+        h.update(source.getbuffer())
+    else:
+        raise TypeError("source must be str (file path) or BytesIO")
+    return h.hexdigest()
+
+def content_addressed_path(source, dest_path: str) -> str:
+    """
+    Replace the file name of `dest_path` with the content hash of `source`, keeping folder and extension.
+
+    Example:
+        `clips/slide_0001.png` -> `clips/<sha256>.png`
+    """
+    folder, filename = os.path.split(dest_path.replace("\\", "/"))
+    ext = os.path.splitext(filename)[1].lower()
+    name = f"{content_hash(source)}{ext}"
+    return f"{folder}/{name}" if folder else name
+
+def load_index_keys() -> set:
+    """
+    Load the keys of the local content-addressed object index, creating the database if needed.
+
+    Returns:
+        set[str]: `"{bucket}/{blob_name}"` keys known to exist in GCS.
+    """
+    global _index_keys
+    with _index_lock:
+        if _index_keys is None:
+            os.makedirs(os.path.dirname(GCS_INDEX_PATH) or ".", exist_ok=True)
+            conn = sqlite3.connect(GCS_INDEX_PATH)
+            c = conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS gcs_objects (
+                    key TEXT PRIMARY KEY,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            c.execute("SELECT key FROM gcs_objects")
+            _index_keys = {row[0] for row in c.fetchall()}
+            conn.commit()
+            conn.close()
+    return _index_keys
+
+def add_index_key(key: str):
+    """Record a content-addressed object in the local index."""
+    keys = load_index_keys()
+    with _index_lock:
+        conn = sqlite3.connect(GCS_INDEX_PATH)
+        conn.execute("INSERT OR IGNORE INTO gcs_objects (key) VALUES (?)", (key,))
+        conn.commit()
+        conn.close()
+        keys.add(key)
+
+def upload_file(source, bucket_name: str, dest_path: str, content_type: str = None, content_addressed: bool = False) -> str:
     """
     Upload a file or in-memory buffer to Google Cloud Storage.
 
     Args:
-        source (str | BytesIO): 
+        source (str | BytesIO):
             - If str: local file path to upload.
             - If BytesIO: in-memory file-like object (e.g., an image buffer).
         bucket_name (str): Name of the target GCS bucket.
         dest_path (str): Destination path (object key) inside the bucket.
+        content_type (str, optional): MIME type of the object. Guessed from the
+            file name for local files if not given.
+        content_addressed (bool, optional): If True, the file name of `dest_path` is replaced
+            by the SHA-256 of the content (see `content_addressed_path`). Objects already
+            recorded in the local index are not uploaded again.
 
     Returns:
         str: Public URL of the uploaded file in GCS.
 
     Notes:
-        - If GOOGLE_APPLICATION_CREDENTIALS is set, it uses that JSON key file.
-        - If not, it falls back to default GCP credentials (e.g., from environment).
+        - Uses the shared client from `get_client`.
         - Automatically handles Windows backslashes in `dest_path` by replacing with "/".
-        - If uploading image/from BytesIO, sets `content_type="image/jpeg"`. 
-        - If uploading video, sets `content_type="video/mp4"`. 
-        - If uploading document/pdf, sets `content_type="application/pdf"`. 
+        - The content-addressed index lives in GCS_INDEX_PATH; it assumes objects are
+          never deleted from the bucket behind its back.
+        - Local files of at least GCS_RESUMABLE_THRESHOLD bytes (e.g. videos) are streamed
+          with a resumable upload in GCS_CHUNK_SIZE chunks instead of a single request.
+        - If uploading image/from BytesIO, sets `content_type="image/jpeg"`.
+        - If uploading video, sets `content_type="video/mp4"`.
+        - If uploading document/pdf, sets `content_type="application/pdf"`.
     """
-    # Initialize GCS client (with explicit service account if provided)
-    if GCS_CRED_JSON:
-        client_gcs = storage.Client.from_service_account_json(GCS_CRED_JSON)
-    else:
-        client_gcs = storage.Client()
-
-    bucket = client_gcs.bucket(bucket_name)
     blob_name = dest_path.replace("\\", "/")  # normalize path separators
+    if content_addressed:
+        blob_name = content_addressed_path(source, blob_name)
+    url = f"https://storage.googleapis.com/{bucket_name}/{blob_name}"
+
+    # Same content already uploaded: skip the network entirely
+    if content_addressed and f"{bucket_name}/{blob_name}" in load_index_keys():
+        return url
+
+    bucket = get_client().bucket(bucket_name)
     blob = bucket.blob(blob_name)
 
     if isinstance(source, str):  # Local file path
-        blob.upload_from_filename(source)
+        if os.path.getsize(source) >= GCS_RESUMABLE_THRESHOLD:
+            blob.chunk_size = GCS_CHUNK_SIZE
+        blob.upload_from_filename(source, content_type=content_type)
     elif isinstance(source, BytesIO):  # In-memory buffer
         blob.upload_from_file(source, content_type=content_type or "application/octet-stream")
     else:
         raise TypeError("source must be str (file path) or BytesIO")
 
+    if content_addressed:
+        add_index_key(f"{bucket_name}/{blob_name}")
+
     # return gcs url
-    return f"https://storage.googleapis.com/{bucket_name}/{blob_name}"
+    return url
+
+def upload_files(items, bucket_name: str, max_workers: int = GCS_POOL_SIZE, content_addressed: bool = False) -> list:
+    """
+    Upload many files or buffers to Google Cloud Storage concurrently.
+
+    Args:
+        items (list[tuple]): `(source, dest_path)` or `(source, dest_path, content_type)`
+            tuples, with the same meaning as the arguments of `upload_file`.
+        bucket_name (str): Name of the target GCS bucket.
+        max_workers (int): Maximum number of uploads in flight.
+        content_addressed (bool): Use content-addressed keys for all items, see `upload_file`.
+
+    Returns:
+        list[str]: Public URLs of the uploaded files, in the same order as `items`.
+
+    Raises:
+        Exception: The first upload error, after the other uploads have finished.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+        futures = [
+            pool.submit(upload_file, item[0], bucket_name, *item[1:], content_addressed=content_addressed)
+            for item in items
+        ]
+        return [future.result() for future in futures]
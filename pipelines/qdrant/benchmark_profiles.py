@@ -0,0 +1,128 @@
+import sys
+import time
+import numpy as np
+from qdrant_client.models import PointStruct, OptimizersConfigDiff
+from pipelines.qdrant.qdrant_utils import (
+    qdrant, COLLECTION_PROFILES, QdrantBatchWriter, collection_config, get_profile, search_params
+)
+
+def load_vectors(collection_name: str, limit: int = 20000) -> np.ndarray:
+    """Scroll up to `limit` vectors out of an existing collection."""
+    vectors, offset = [], None
+    while len(vectors) < limit:
+        records, offset = qdrant.scroll(
+            collection_name=collection_name,
+            limit=min(256, limit - len(vectors)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=True,
+        )
+        # Hybrid collections return named vectors, the dense one is unnamed
+        vectors.extend(record.vector.get("") if isinstance(record.vector, dict) else record.vector for record in records)
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32)
+
+def estimate_ram_mb(n: int, dim: int, profile: str) -> float:
+    """
+    Estimate the RAM used by the vectors and HNSW graph of a profile.
+
+    Qdrant does not report memory per collection, so this counts float32 vectors
+    (unless on disk), quantized vectors (always in RAM) and ~2*m links per point.
+    """
+    config = get_profile(profile)
+    ram = 0 if config["on_disk"] else n * dim * 4
+    if config["quantization"] == "scalar":
+        ram += n * dim
+    elif config["quantization"] == "binary":
+        ram += n * dim / 8
+    ram += n * config["m"] * 2 * 4
+    return round(ram / (1024 * 1024), 1)
+
+def wait_for_index(collection_name: str, timeout: float = 600):
+    """Wait until the optimizers have finished building the HNSW index."""
+    start = time.time()
+    while time.time() - start < timeout:
+        if str(qdrant.get_collection(collection_name).status).lower().endswith("green"):
+            return
+        time.sleep(1)
+
+def benchmark_profiles(source_collection: str = "hackaton-collection", profiles=None, limit: int = 20000,
+                       queries: int = 200, k: int = 10) -> list:
+    """
+    Compare collection profiles on vectors from an existing collection.
+
+    Every profile gets a temporary copy of the vectors; a sample of the vectors is used
+    as queries, and exact cosine search in NumPy is the ground truth for recall@k.
+
+    Args:
+        source_collection (str): Collection to copy vectors from.
+        profiles (list[str], optional): Profiles to test, defaults to all of COLLECTION_PROFILES.
+        limit (int): Maximum number of vectors copied per profile.
+        queries (int): Number of query vectors.
+        k (int): Number of results per query.
+
+    Returns:
+        list[dict]: Per profile: recall@k, p50/p99 latency in ms and estimated RAM in MB.
+    """
+    vectors = load_vectors(source_collection, limit)
+    if len(vectors) == 0:
+        print(f"Collection '{source_collection}' kosong")
+        return []
+
+    rng = np.random.default_rng(0)
+    query_ids = rng.choice(len(vectors), size=min(queries, len(vectors)), replace=False)
+
+    # Exact top-k by cosine similarity
+    normalized = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    scores = normalized[query_ids] @ normalized.T
+    truth = np.argsort(-scores, axis=1)[:, :k]
+
+    results = []
+    for profile in profiles or list(COLLECTION_PROFILES):
+        name = f"bench-{profile}"
+        if qdrant.collection_exists(name):
+            qdrant.delete_collection(name)
+        # Index from the first point, so small samples are searched through HNSW too
+        qdrant.create_collection(
+            collection_name=name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=1),
+            **collection_config(vectors.shape[1], profile, sparse=False),
+        )
+        try:
+            with QdrantBatchWriter(name) as writer:
+                for i, vector in enumerate(vectors):
+                    writer.add(PointStruct(id=i, vector=vector.tolist(), payload={}))
+            wait_for_index(name)
+
+            latencies, hits = [], 0
+            for row, query_id in enumerate(query_ids):
+                start = time.perf_counter()
+                response = qdrant.query_points(
+                    collection_name=name,
+                    query=vectors[query_id].tolist(),
+                    search_params=search_params(profile),
+                    limit=k,
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += len({p.id for p in response.points} & set(truth[row].tolist()))
+
+            results.append({
+                "profile": profile,
+                "points": len(vectors),
+                f"recall@{k}": round(hits / (len(query_ids) * k), 4),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+                "estimated_ram_mb": estimate_ram_mb(len(vectors), vectors.shape[1], profile),
+            })
+            print(results[-1])
+        finally:
+            qdrant.delete_collection(name)
+    return results
+
+
+if __name__ == "__main__":
+    # usage: python -m pipelines.qdrant.benchmark_profiles [source_collection] [limit]
+    source = sys.argv[1] if len(sys.argv) > 1 else "hackaton-collection"
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    benchmark_profiles(source, limit=limit)
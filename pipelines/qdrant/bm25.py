@@ -0,0 +1,56 @@
+import os
+import re
+import hashlib
+from collections import Counter
+from qdrant_client.models import SparseVector
+
+# BM25 parameters; IDF is applied by Qdrant (sparse vectors with Modifier.IDF)
+BM25_K1 = float(os.getenv("BM25_K1", 1.2))
+BM25_B = float(os.getenv("BM25_B", 0.75))
+# Typical transcription length in tokens, used for length normalization
+BM25_AVG_DOC_LEN = float(os.getenv("BM25_AVG_DOC_LEN", 150))
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Common English and Indonesian function words that carry no lexical signal
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was", "be", "this",
+    "that", "it", "with", "as", "by", "at", "from", "what", "how", "explain", "about",
+    "yang", "dan", "di", "ke", "dari", "ini", "itu", "untuk", "dengan", "pada", "adalah", "atau",
+    "dalam", "akan", "juga", "tidak", "ada", "kita", "kamu", "saya", "jelaskan", "apa", "bagaimana",
+}
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens without stopwords; course codes like "IF2130" stay one token."""
+    return [t for t in TOKEN_PATTERN.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+def token_id(token: str) -> int:
+    """Stable 31-bit index of a token in the sparse vector space."""
+    return int.from_bytes(hashlib.md5(token.encode("utf-8")).digest()[:4], "little") & 0x7FFFFFFF
+
+def bm25_document_vector(text: str, k1: float = BM25_K1, b: float = BM25_B, avg_len: float = BM25_AVG_DOC_LEN) -> SparseVector:
+    """
+    Encode a document (e.g. a segment transcription) as BM25 term weights.
+
+    Args:
+        text (str): Document text.
+        k1 (float): Term frequency saturation.
+        b (float): Length normalization strength.
+        avg_len (float): Average document length in tokens.
+
+    Returns:
+        SparseVector: Token ids and their saturated, length-normalized term frequencies.
+    """
+    tokens = tokenize(text)
+    counts = Counter(token_id(t) for t in tokens)
+    norm = k1 * (1 - b + b * len(tokens) / avg_len)
+    indices = sorted(counts)
+    return SparseVector(
+        indices=indices,
+        values=[counts[i] * (k1 + 1) / (counts[i] + norm) for i in indices],
+    )
+
+def bm25_query_vector(text: str) -> SparseVector:
+    """Encode a query as the set of its tokens (weight 1 each); Qdrant multiplies in the IDF."""
+    indices = sorted({token_id(t) for t in tokenize(text)})
+    return SparseVector(indices=indices, values=[1.0] * len(indices))
@@ -1,26 +1,299 @@
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance
+from qdrant_client.models import (
+    VectorParams, Distance, PayloadSchemaType, Filter, FieldCondition, MatchValue, MatchAny, Range,
+    HnswConfigDiff, SearchParams, QuantizationSearchParams, ScalarQuantization, ScalarQuantizationConfig,
+    ScalarType, BinaryQuantization, BinaryQuantizationConfig, SparseVectorParams, Modifier, PayloadSelectorExclude
+)
 import os
+import json
+import hashlib
+import weakref
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from pipelines.utils.retry import retry_with_backoff
 load_dotenv()
 
-# Initialize the Qdrant client with the URL, API key, and a connection timeout
-qdrant = QdrantClient(
-    url=os.getenv("QDRANT_URL2"),
-    api_key=os.getenv("QDRANT_API_KEY2"),
-    timeout=60.0 # Time out set to prevents application from getting stuck waiting
-)
+# Streaming writes: points per upsert request, requests in flight, and retries per batch
+QDRANT_BATCH_SIZE = int(os.getenv("QDRANT_BATCH_SIZE", 64))
+QDRANT_PARALLEL = int(os.getenv("QDRANT_PARALLEL", 4))
+QDRANT_MAX_RETRIES = int(os.getenv("QDRANT_MAX_RETRIES", 3))
+
+# Storage / index profiles for vector collections:
+# - quantization: None, "scalar" (int8, 4x smaller) or "binary" (1 bit, 32x smaller), kept in RAM
+# - on_disk: keep the original float32 vectors on disk (memmap), only used for rescoring
+# - m / ef_construct: HNSW graph degree and build-time beam width, ef: search-time beam width (None = server default)
+# - oversampling: candidates fetched from the quantized index per result before rescoring
+COLLECTION_PROFILES = {
+    "default": {"quantization": None, "on_disk": False, "m": 16, "ef_construct": 100, "ef": None, "oversampling": 1.0},
+    "scalar": {"quantization": "scalar", "on_disk": False, "m": 16, "ef_construct": 100, "ef": 128, "oversampling": 2.0},
+    "scalar-disk": {"quantization": "scalar", "on_disk": True, "m": 16, "ef_construct": 200, "ef": 128, "oversampling": 2.0},
+    "binary-disk": {"quantization": "binary", "on_disk": True, "m": 32, "ef_construct": 256, "ef": 256, "oversampling": 3.0},
+}
+QDRANT_COLLECTION_PROFILE = os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+
+# Named sparse (BM25) vector over segment transcriptions, next to the unnamed dense vector
+SPARSE_VECTOR_NAME = "transcription"
+
+# Payload fields only used for ingest bookkeeping; searches pass `PUBLIC_PAYLOAD` as
+# `with_payload` so they are never returned to callers (or to the LLM)
+INTERNAL_PAYLOAD_FIELDS = ["payload_hash"]
+PUBLIC_PAYLOAD = PayloadSelectorExclude(exclude=INTERNAL_PAYLOAD_FIELDS)
+
+# Per-client caches of collection properties, {client: {collection_name: value}}: two clients
+# (e.g. the remote store and an embedded one) can hold different collections of the same name
+_sparse_collections = weakref.WeakKeyDictionary()
+_collection_search_params = weakref.WeakKeyDictionary()
+_cache_lock = threading.Lock()
+
+# Vector store backend: "remote" (Qdrant server at QDRANT_URL2), "local" (embedded Qdrant
+# persisted in VECTOR_STORE_PATH) or "memory" (embedded, in-process only). All backends expose
+# the same QdrantClient API, so query_points / filters / fusion behave the same everywhere.
+VECTOR_STORE_BACKENDS = ("remote", "local", "memory")
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "remote")
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "data/qdrant_local")
+
+_embedded_clients = {}
+_embedded_lock = threading.Lock()
+
+def create_client(backend: str = VECTOR_STORE_BACKEND, path: str = VECTOR_STORE_PATH) -> QdrantClient:
+    """
+    Create a Qdrant client for a vector store backend.
+
+    Embedded backends ("local", "memory") are shared per process: local storage can only be
+    opened by one client, and every ":memory:" client would otherwise get its own empty store.
+
+    Args:
+        backend (str): One of VECTOR_STORE_BACKENDS.
+        path (str): Storage folder of the "local" backend.
+
+    Returns:
+        QdrantClient: Client for the backend.
+    """
+    if backend == "remote":
+        # Initialize the Qdrant client with the URL, API key, and a connection timeout
+        return QdrantClient(
+            url=os.getenv("QDRANT_URL2"),
+            api_key=os.getenv("QDRANT_API_KEY2"),
+            timeout=60.0 # Time out set to prevents application from getting stuck waiting
+        )
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(f"Unknown vector store backend '{backend}', choose from {VECTOR_STORE_BACKENDS}")
+
+    key = (backend, path if backend == "local" else None)
+    with _embedded_lock:
+        if key not in _embedded_clients:
+            _embedded_clients[key] = QdrantClient(path=path) if backend == "local" else QdrantClient(location=":memory:")
+        return _embedded_clients[key]
+
+qdrant = create_client()
+
+# Payload indexes of video segment points, used to filter inside the HNSW search
+SEGMENT_PAYLOAD_INDEXES = {
+    "url": PayloadSchemaType.KEYWORD,
+    "embedding_option": PayloadSchemaType.KEYWORD,
+    "embedding_scope": PayloadSchemaType.KEYWORD,
+    "start_offset_sec": PayloadSchemaType.FLOAT,
+    "end_offset_sec": PayloadSchemaType.FLOAT,
+}
+
+def get_profile(profile: str = QDRANT_COLLECTION_PROFILE) -> dict:
+    """Look up a collection profile by name, see COLLECTION_PROFILES."""
+    if profile not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown collection profile '{profile}', choose from {list(COLLECTION_PROFILES)}")
+    return COLLECTION_PROFILES[profile]
+
+def collection_config(vector_size: int = 1024, profile: str = QDRANT_COLLECTION_PROFILE, sparse: bool = True) -> dict:
+    """
+    Build the `create_collection` arguments of a collection profile.
+
+    Args:
+        vector_size (int): The dimension of the vectors.
+        profile (str): Name of the profile in COLLECTION_PROFILES.
+        sparse (bool): Also declare the BM25 sparse vector SPARSE_VECTOR_NAME (IDF computed by Qdrant).
+
+    Returns:
+        dict: `vectors_config`, `sparse_vectors_config`, `hnsw_config` and `quantization_config` keyword arguments.
+    """
+    config = get_profile(profile)
+    quantization_config = None
+    if config["quantization"] == "scalar":
+        quantization_config = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif config["quantization"] == "binary":
+        quantization_config = BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+
+    return {
+        "vectors_config": VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=config["on_disk"]),
+        "sparse_vectors_config": {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)} if sparse else None,
+        "hnsw_config": HnswConfigDiff(m=config["m"], ef_construct=config["ef_construct"]),
+        "quantization_config": quantization_config,
+    }
+
+def search_params(profile: str = QDRANT_COLLECTION_PROFILE) -> SearchParams:
+    """
+    Build the search parameters of a collection profile: HNSW `ef` and, for quantized
+    profiles, rescoring of the oversampled candidates with the original vectors.
+    """
+    config = get_profile(profile)
+    quantization = None
+    if config["quantization"]:
+        quantization = QuantizationSearchParams(rescore=True, oversampling=config["oversampling"])
+    return SearchParams(hnsw_ef=config["ef"], quantization=quantization)
+
+def detect_profile(collection_info) -> str:
+    """
+    Find the profile a collection was created with, from its `get_collection` info.
+
+    Returns:
+        str | None: Name in COLLECTION_PROFILES, or None if no profile matches
+            (e.g. a collection created before profiles existed).
+    """
+    config = collection_info.config
+    vectors = config.params.vectors
+    dense = vectors.get("") if isinstance(vectors, dict) else vectors
+    quantization = config.quantization_config
+    if isinstance(quantization, ScalarQuantization):
+        quantization = "scalar"
+    elif isinstance(quantization, BinaryQuantization):
+        quantization = "binary"
+    else:
+        quantization = None
+
+    for name, profile in COLLECTION_PROFILES.items():
+        if (profile["quantization"] == quantization and profile["on_disk"] == bool(dense and dense.on_disk)
+                and profile["m"] == config.hnsw_config.m and profile["ef_construct"] == config.hnsw_config.ef_construct):
+            return name
+    return None
+
+def _client_cache(cache: weakref.WeakKeyDictionary, client: QdrantClient) -> dict:
+    """Return the {collection_name: value} cache of `client`."""
+    with _cache_lock:
+        return cache.setdefault(client, {})
+
+def forget_collection(collection_name: str, client: QdrantClient = qdrant):
+    """Drop the cached properties of a collection, e.g. after it was (re)created."""
+    for cache in (_sparse_collections, _collection_search_params):
+        _client_cache(cache, client).pop(collection_name, None)
+
+def collection_search_params(collection_name: str, client: QdrantClient = qdrant) -> SearchParams:
+    """
+    Search parameters matching how a collection was created (looked up once per client).
+
+    Query parameters follow the collection, not QDRANT_COLLECTION_PROFILE: a quantized
+    collection always gets rescoring and oversampling, whatever profile new collections use.
+    Collections that match no profile keep the server defaults, with rescoring if quantized.
+    """
+    cache = _client_cache(_collection_search_params, client)
+    if collection_name not in cache:
+        info = client.get_collection(collection_name)
+        profile = detect_profile(info)
+        if profile is not None:
+            params = search_params(profile)
+        elif info.config.quantization_config is not None:
+            params = SearchParams(quantization=QuantizationSearchParams(rescore=True))
+        else:
+            params = None
+        cache[collection_name] = params
+    return cache[collection_name]
+
+def has_sparse_vectors(collection_name: str, client: QdrantClient = qdrant) -> bool:
+    """
+    Check (once per client) whether a collection has the BM25 sparse vector.
+
+    Collections created before hybrid search only have the dense vector; sparse vectors
+    can't be added to them afterwards, so they keep using dense-only search.
+    """
+    cache = _client_cache(_sparse_collections, client)
+    if collection_name not in cache:
+        sparse_vectors = client.get_collection(collection_name).config.params.sparse_vectors or {}
+        cache[collection_name] = SPARSE_VECTOR_NAME in sparse_vectors
+    return cache[collection_name]
+
+# Video / chapter rollup vectors live in a sibling collection of the segment collection
+ROLLUP_COLLECTION_SUFFIX = "-rollups"
+ROLLUP_PAYLOAD_INDEXES = {
+    **SEGMENT_PAYLOAD_INDEXES,
+    "level": PayloadSchemaType.KEYWORD,
+}
+
+def rollup_collection_name(collection_name: str) -> str:
+    """Name of the rollup collection that belongs to a segment collection."""
+    return f"{collection_name}{ROLLUP_COLLECTION_SUFFIX}"
+
+def ensure_payload_indexes(collection_name: str, indexes: dict = SEGMENT_PAYLOAD_INDEXES, client: QdrantClient = qdrant):
+    """
+    Create the payload indexes of a collection that don't exist yet.
+
+    Args:
+        collection_name (str): The name of the collection.
+        indexes (dict): Field name -> PayloadSchemaType.
+        client (QdrantClient): Vector store holding the collection.
+    """
+    existing = client.get_collection(collection_name).payload_schema or {}
+    for field_name, schema in indexes.items():
+        if field_name in existing:
+            continue
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=schema,
+            wait=True,
+        )
+        print(f"Payload index '{field_name}' dibuat di '{collection_name}'")
 
-def create_collection_if_not_exists(collection_name: str, vector_size: int = 1024):
+def build_segment_filter(video_url=None, start_sec: float = None, end_sec: float = None, embedding_option=None,
+                         strict: bool = False):
     """
-    Checks if a collection exists in Qdrant and creates it if it doesn't.
+    Build a Qdrant filter for video segment search.
+
+    Args:
+        video_url (str | list[str], optional): Only segments of this video (or any of these videos, e.g. one course).
+        start_sec (float, optional): Only segments that end after this offset.
+        end_sec (float, optional): Only segments that start before this offset.
+        embedding_option (str | list[str], optional): e.g. "visual-text" and/or "audio".
+        strict (bool): Exclude segments that only touch the range at a boundary, e.g. the
+            segment (54, 60) for a chapter [60, 120]. Inclusive bounds by default.
+
+    Returns:
+        Filter | None: The filter, or None if no condition is given.
+    """
+    def match(value):
+        return MatchAny(any=list(value)) if isinstance(value, (list, tuple, set)) else MatchValue(value=value)
+
+    conditions = []
+    if video_url:
+        conditions.append(FieldCondition(key="url", match=match(video_url)))
+    if embedding_option:
+        conditions.append(FieldCondition(key="embedding_option", match=match(embedding_option)))
+    # Segments overlapping [start_sec, end_sec]
+    if start_sec is not None:
+        bound = Range(gt=start_sec) if strict else Range(gte=start_sec)
+        conditions.append(FieldCondition(key="end_offset_sec", range=bound))
+    if end_sec is not None:
+        bound = Range(lt=end_sec) if strict else Range(lte=end_sec)
+        conditions.append(FieldCondition(key="start_offset_sec", range=bound))
+
+    return Filter(must=conditions) if conditions else None
+
+def create_collection_if_not_exists(collection_name: str, vector_size: int = 1024, profile: str = QDRANT_COLLECTION_PROFILE,
+                                   sparse: bool = True, payload_indexes: dict = SEGMENT_PAYLOAD_INDEXES,
+                                   client: QdrantClient = qdrant):
+    """
+    Checks if a collection exists in Qdrant and creates it if it doesn't,
+    then makes sure the video segment payload indexes exist.
     
     Args:
         collection_name (str): The name of the collection to check/create.
         vector_size (int): The dimension of the vectors to be stored in the collection. Defaults to 1024.
+        profile (str): Storage / HNSW profile used when the collection is created, see COLLECTION_PROFILES.
+        sparse (bool): Declare the BM25 sparse vector when the collection is created.
+        payload_indexes (dict): Payload indexes to declare, field name -> PayloadSchemaType.
+        client (QdrantClient): Vector store holding the collection.
     """
     # Get the list of all collections currently in the Qdrant instance
-    collections = qdrant.get_collections().collections
+    collections = client.get_collections().collections
 
     # Check if a collection with the given name already exists in the list
     exists = any(c.name == collection_name for c in collections)
@@ -28,12 +301,179 @@ def create_collection_if_not_exists(collection_name: str, vector_size: int = 102
     # If the collection does not exist, create it
     if not exists:
         # Create a new collection with the specified name and vector configuration
-        qdrant.create_collection(
+        client.create_collection(
             collection_name=collection_name,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+            **collection_config(vector_size, profile, sparse=sparse)
         )
-        print(f"Collection '{collection_name}' dibuat")
+        forget_collection(collection_name, client)
+        print(f"Collection '{collection_name}' dibuat (profile '{profile}')")
     else:
         print(f"Collection '{collection_name}' sudah ada")
+        if sparse and not has_sparse_vectors(collection_name, client):
+            print(f"⚠️ Collection '{collection_name}' tanpa sparse vector '{SPARSE_VECTOR_NAME}', hybrid search nonaktif")
+
+    # Declare payload indexes (also on collections created before they existed)
+    ensure_payload_indexes(collection_name, payload_indexes, client=client)
+
+    return client
+
+def payload_hash(payload: dict, vector=None) -> str:
+    """
+    Hash of a point's payload (and vector, if given), stored as `payload_hash` to detect unchanged points.
+
+    Args:
+        payload (dict): Point payload, without `payload_hash`.
+        vector (list[float], optional): Point vector.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    content = {k: v for k, v in payload.items() if k != "payload_hash"}
+    data = json.dumps([content, vector], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class QdrantBatchWriter:
+    """
+    Streaming writer that upserts points to a Qdrant collection in parallel batches.
+
+    Points are buffered and sent in batches of `batch_size` with `wait=False`, so Qdrant
+    acknowledges them without waiting for indexing, while up to `parallel` batches are in
+    flight. Each batch is retried on its own with backoff. `close` is the barrier: it waits
+    for all batches and sends the last one with `wait=True`, which Qdrant applies after the
+    earlier ones.
+
+    With `skip_unchanged=True`, every point gets a `payload_hash` in its payload, and points
+    whose ID already exists with the same hash are not written again. Point IDs must then be
+    deterministic (e.g. `segment_point_id`), which makes re-ingest incremental.
+
+    Usage:
+        with QdrantBatchWriter("my-collection") as writer:
+            for point in points:
+                writer.add(point)
+    """
+
+    def __init__(self, collection_name: str, client: QdrantClient = qdrant, batch_size: int = QDRANT_BATCH_SIZE,
+                 parallel: int = QDRANT_PARALLEL, retries: int = QDRANT_MAX_RETRIES, skip_unchanged: bool = False):
+        self.collection_name = collection_name
+        self.client = client
+        self.batch_size = max(1, batch_size)
+        self.retries = retries
+        self.skip_unchanged = skip_unchanged
+        self.buffer = []
+        self.futures = []
+        self.last_point = None
+        self.written = 0
+        self.failed = 0
+        self.unchanged = 0
+        self.lock = threading.Lock()
+        # Bounds the number of batches waiting in the pool, so memory stays flat on large backfills
+        self.slots = threading.BoundedSemaphore(max(1, parallel) * 2)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, parallel))
+
+    def drop_unchanged(self, batch: list) -> list:
+        """Return the points of `batch` whose stored `payload_hash` differs (or that don't exist yet)."""
+        existing = retry_with_backoff(
+            self.client.retrieve,
+            collection_name=self.collection_name,
+            ids=[point.id for point in batch],
+            with_payload=["payload_hash"],
+            with_vectors=False,
+            retries=self.retries,
+        )
+        stored = {str(record.id): (record.payload or {}).get("payload_hash") for record in existing}
+        changed = [point for point in batch if stored.get(str(point.id)) != point.payload["payload_hash"]]
+        with self.lock:
+            self.unchanged += len(batch) - len(changed)
+        return changed
+
+    def upsert_batch(self, batch: list, wait: bool) -> int:
+        """Upsert one batch, retrying transient errors. Returns the number of points written."""
+        points = self.drop_unchanged(batch) if self.skip_unchanged else batch
+        written = len(points)
+        if not points:
+            # Nothing changed; the final batch still rewrites one point as the barrier
+            if not (wait and self.written):
+                return 0
+            points = batch[-1:]
+        retry_with_backoff(
+            self.client.upsert,
+            collection_name=self.collection_name,
+            points=points,
+            wait=wait,
+            retries=self.retries,
+        )
+        return written
+
+    def submit(self, batch: list):
+        self.slots.acquire()
+
+        def run():
+            try:
+                written = self.upsert_batch(batch, wait=False)
+                with self.lock:
+                    self.written += written
+            except Exception as e:
+                with self.lock:
+                    self.failed += len(batch)
+                print(f"⚠️ Skip batch {len(batch)} point karena error: {e}")
+            finally:
+                self.slots.release()
+
+        self.futures.append(self.pool.submit(run))
+
+    def add(self, point):
+        """Buffer a point, sending a batch once more than `batch_size` points are buffered."""
+        if self.skip_unchanged:
+            point.payload = {**(point.payload or {}), "payload_hash": payload_hash(point.payload or {}, point.vector)}
+        self.buffer.append(point)
+        # Keep at least one point buffered, it goes out with the final `wait=True` batch
+        if len(self.buffer) > self.batch_size:
+            batch, self.buffer = self.buffer[:self.batch_size], self.buffer[self.batch_size:]
+            self.submit(batch)
+
+    def flush(self):
+        """Send all buffered points now, without waiting (e.g. right after a checkpoint)."""
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self.last_point = batch[-1]
+            self.submit(batch)
+
+    def close(self) -> dict:
+        """
+        Flush all buffered points and wait until Qdrant has applied them.
+
+        Returns:
+            dict: Number of points written, skipped as unchanged, and failed.
+        """
+        for future in self.futures:
+            future.result()
+        self.futures = []
+        self.pool.shutdown(wait=True)
+
+        # Final barrier: synchronous upsert of the tail, applied after all earlier batches
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            try:
+                self.written += self.upsert_batch(batch, wait=True)
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"⚠️ Skip batch {len(batch)} point karena error: {e}")
+        elif self.last_point is not None and self.written:
+            # Everything went out with `flush`: rewrite the last point synchronously as the barrier
+            try:
+                retry_with_backoff(
+                    self.client.upsert,
+                    collection_name=self.collection_name,
+                    points=[self.last_point],
+                    wait=True,
+                    retries=self.retries,
+                )
+            except Exception as e:
+                print(f"⚠️ Barrier upsert gagal: {e}")
+        return {"written": self.written, "unchanged": self.unchanged, "failed": self.failed}
+
+    def __enter__(self):
+        return self
 
-    return qdrant
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, SparseVector
+from pipelines.qdrant.qdrant_utils import (
+    qdrant, create_client, collection_config, ensure_payload_indexes, forget_collection, QdrantBatchWriter,
+    SPARSE_VECTOR_NAME
+)
+
+SNAPSHOT_DIR = "data/snapshots"
+
+def export_snapshot(collection_name: str, snapshot_path: str = None, client: QdrantClient = qdrant, batch_size: int = 256) -> str:
+    """
+    Export a collection (ids, dense + sparse vectors, payloads) to a portable JSONL snapshot.
+
+    Unlike Qdrant server snapshots, this file can be loaded into any backend,
+    including the embedded "local" / "memory" ones (see `create_client`).
+
+    Args:
+        collection_name (str): Collection to export, e.g. "hackaton-collection".
+        snapshot_path (str, optional): Output file, defaults to SNAPSHOT_DIR/<collection>.jsonl.
+        client (QdrantClient): Client of the source vector store.
+        batch_size (int): Points fetched per scroll request.
+
+    Returns:
+        str: Path of the written snapshot.
+    """
+    snapshot_path = snapshot_path or os.path.join(SNAPSHOT_DIR, f"{collection_name}.jsonl")
+    os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+
+    params = client.get_collection(collection_name).config.params
+    vectors = params.vectors
+    vector_size = vectors.size if hasattr(vectors, "size") else vectors[""].size
+    sparse = SPARSE_VECTOR_NAME in (params.sparse_vectors or {})
+
+    count, offset = 0, None
+    with open(snapshot_path, "w", encoding="utf-8") as f:
+        # First line: collection metadata
+        f.write(json.dumps({"collection": collection_name, "vector_size": vector_size, "sparse": sparse}) + "\n")
+        while True:
+            records, offset = client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            for record in records:
+                vector = record.vector
+                dense = vector.get("") if isinstance(vector, dict) else vector
+                sparse_vector = vector.get(SPARSE_VECTOR_NAME) if isinstance(vector, dict) else None
+                f.write(json.dumps({
+                    "id": record.id,
+                    "vector": dense,
+                    "sparse": {"indices": sparse_vector.indices, "values": sparse_vector.values} if sparse_vector else None,
+                    "payload": record.payload,
+                }, ensure_ascii=False) + "\n")
+            count += len(records)
+            if offset is None:
+                break
+
+    print(f"Snapshot '{collection_name}' ({count} point) disimpan di {snapshot_path}")
+    return snapshot_path
+
+def load_snapshot(snapshot_path: str, client: QdrantClient = None, collection_name: str = None, profile: str = "default") -> str:
+    """
+    Load a JSONL snapshot from `export_snapshot` into a vector store, replacing the collection.
+
+    Args:
+        snapshot_path (str): Snapshot file.
+        client (QdrantClient, optional): Target vector store, defaults to an in-process "memory" store.
+        collection_name (str, optional): Target collection, defaults to the exported collection name.
+        profile (str): Collection profile used to recreate the collection.
+
+    Returns:
+        str: Name of the loaded collection.
+    """
+    client = client or create_client("memory")
+    with open(snapshot_path, "r", encoding="utf-8") as f:
+        meta = json.loads(f.readline())
+        collection_name = collection_name or meta["collection"]
+
+        if client.collection_exists(collection_name):
+            client.delete_collection(collection_name)
+        client.create_collection(
+            collection_name=collection_name,
+            **collection_config(meta["vector_size"], profile, sparse=meta["sparse"]),
+        )
+        # The recreated collection may differ from the cached one (profile, sparse vector)
+        forget_collection(collection_name, client)
+
+        count = 0
+        with QdrantBatchWriter(collection_name, client=client) as writer:
+            for line in f:
+                point = json.loads(line)
+                vector = point["vector"]
+                if meta["sparse"]:
+                    sparse = point["sparse"] or {"indices": [], "values": []}
+                    vector = {"": vector, SPARSE_VECTOR_NAME: SparseVector(**sparse)}
+                writer.add(PointStruct(id=point["id"], vector=vector, payload=point["payload"]))
+                count += 1
+
+    ensure_payload_indexes(collection_name, client=client)
+    print(f"Snapshot {snapshot_path} ({count} point) dimuat ke '{collection_name}'")
+    return collection_name
+
+
+if __name__ == "__main__":
+    # usage:
+    #   python -m pipelines.qdrant.snapshot export hackaton-collection [snapshot_path]
+    #   VECTOR_STORE_BACKEND=local python -m pipelines.qdrant.snapshot load data/snapshots/hackaton-collection.jsonl
+    command, target = sys.argv[1], sys.argv[2]
+    path = sys.argv[3] if len(sys.argv) > 3 else None
+    if command == "export":
+        export_snapshot(target, path)
+    elif command == "load":
+        load_snapshot(target, client=qdrant)
@@ -0,0 +1,56 @@
+import sys
+import time
+import cv2
+from pipelines.twelve_labs.twelvelabs_utils import SAMPLING_MODES, get_frames_to_skip, iter_sampled_frames
+
+def benchmark_sampling(video_path: str, checks_per_second: int = 1, modes=SAMPLING_MODES) -> list:
+    """
+    Compare the frame sampling modes used by `extract_slides` on a single video.
+
+    Every mode walks the whole video with the same sampling interval and only
+    retrieves the sampled frames, so the difference in wall time is the cost of
+    skipping the frames in between.
+
+    Args:
+        video_path (str): Path to a local video file (e.g. a lecture recording).
+        checks_per_second (int): Sampling rate used by slide extraction.
+        modes (tuple[str]): Sampling modes to compare.
+
+    Returns:
+        list[dict]: One entry per mode with the number of sampled frames, the wall time,
+            and the throughput in video frames covered per second.
+    """
+    results = []
+    for mode in modes:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video file {video_path}")
+            return results
+
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        frames_to_skip = get_frames_to_skip(cap.get(cv2.CAP_PROP_FPS), checks_per_second)
+
+        start = time.perf_counter()
+        sampled = sum(1 for _ in iter_sampled_frames(cap, frames_to_skip, mode))
+        elapsed = time.perf_counter() - start
+        cap.release()
+
+        results.append({
+            "video": video_path,
+            "mode": mode,
+            "total_frames": total_frames,
+            "sampled_frames": sampled,
+            "seconds": round(elapsed, 3),
+            "frames_per_sec": round(total_frames / elapsed, 1) if elapsed else 0.0,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    # usage: python -m pipelines.twelve_labs.benchmark_sampling video1.mp4 [video2.mp4 ...]
+    for video_path in sys.argv[1:]:
+        for row in benchmark_sampling(video_path):
+            print(
+                f"{row['video']} [{row['mode']:>4}] {row['sampled_frames']}/{row['total_frames']} frames sampled "
+                f"in {row['seconds']}s ({row['frames_per_sec']} frames/sec)"
+            )
@@ -0,0 +1,68 @@
+import sys
+import time
+import cv2
+import numpy as np
+from skimage.metrics import structural_similarity as ssim
+from pipelines.twelve_labs.twelvelabs_utils import get_frames_to_skip, iter_sampled_frames, preprocess_frame
+from pipelines.twelve_labs.slide_similarity import SSIM_CANDIDATE_BATCH, make_thumbnail, ssim_batch, to_stack
+
+def benchmark_similarity(video_path: str, checks_per_second: int = 1, max_frames: int = 500) -> dict:
+    """
+    Check `ssim_batch` against `skimage` SSIM on consecutive sampled frames of a video.
+
+    Both engines score the same frame pairs slide detection compares (full resolution
+    unless SLIDE_THUMB_WIDTH is set, SLIDE_CANDIDATE_BATCH pairs per `ssim_batch` call),
+    so the maximum score difference shows whether `change_threshold` /
+    `deduplication_threshold` keep their meaning, and the timings show the speed-up
+    of the batched engine. The deterministic parity check on synthetic
+    frames is `tests/test_slide_similarity.py`.
+
+    Args:
+        video_path (str): Path to a local video file (e.g. a lecture recording).
+        checks_per_second (int): Sampling rate used by slide extraction.
+        max_frames (int): Maximum number of sampled frames to compare.
+
+    Returns:
+        dict: Number of pairs, maximum absolute score difference, and seconds per engine.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open video file {video_path}")
+        return {}
+
+    frames_to_skip = get_frames_to_skip(cap.get(cv2.CAP_PROP_FPS), checks_per_second)
+    thumbs = []
+    for _, frame in iter_sampled_frames(cap, frames_to_skip):
+        thumbs.append(make_thumbnail(preprocess_frame(frame)))
+        if len(thumbs) >= max_frames:
+            break
+    cap.release()
+
+    if len(thumbs) < 2:
+        return {}
+
+    start = time.perf_counter()
+    reference = [ssim(a, b) for a, b in zip(thumbs[:-1], thumbs[1:])]
+    skimage_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    previous, current = thumbs[:-1], thumbs[1:]
+    batched = np.concatenate([
+        ssim_batch(to_stack(previous[i:i + SSIM_CANDIDATE_BATCH]), to_stack(current[i:i + SSIM_CANDIDATE_BATCH]))
+        for i in range(0, len(previous), SSIM_CANDIDATE_BATCH)
+    ])
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "video": video_path,
+        "pairs": len(reference),
+        "max_abs_diff": float(max(abs(r - b) for r, b in zip(reference, batched))),
+        "skimage_seconds": round(skimage_seconds, 3),
+        "batch_seconds": round(batch_seconds, 3),
+    }
+
+
+if __name__ == "__main__":
+    # usage: python -m pipelines.twelve_labs.benchmark_similarity video1.mp4 [video2.mp4 ...]
+    for video_path in sys.argv[1:]:
+        print(benchmark_similarity(video_path))
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# In-process LRU of text -> embedding vectors
+EMBED_CACHE_SIZE = int(os.environ.get("EMBED_CACHE_SIZE", 1024))
+# Seconds an embedding stays valid, 0 = never expires
+EMBED_CACHE_TTL = float(os.environ.get("EMBED_CACHE_TTL", 7 * 24 * 3600))
+# Optional on-disk cache shared across processes, empty = memory only
+EMBED_CACHE_PATH = os.environ.get("EMBED_CACHE_PATH", "data/registry/embedding_cache.db")
+
+def normalize_text(text: str) -> str:
+    """Normalize a query so trivial variations (case, extra whitespace) share one cache entry."""
+    return " ".join((text or "").split()).casefold()
+
+def make_embedding_key(text: str, model_name: str) -> str:
+    """Build a cache key from the normalized text and the embedding model name."""
+    return hashlib.sha256(f"{model_name}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Two-level cache of text embeddings: an in-process LRU in front of an optional SQLite file.
+
+    Entries older than `ttl` seconds are treated as misses in both levels.
+    Hit/miss counters are kept per process, see `stats`.
+    """
+
+    def __init__(self, max_size: int = EMBED_CACHE_SIZE, ttl: float = EMBED_CACHE_TTL, path: str = EMBED_CACHE_PATH):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.initialized = False
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the on-disk cache, creating it on first use."""
+        if not self.initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if not self.initialized:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key TEXT PRIMARY KEY,
+                    model_name TEXT,
+                    vector TEXT,
+                    created_at REAL
+                )
+            ''')
+            conn.commit()
+            self.initialized = True
+        return conn
+
+    def is_expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.time() - created_at > self.ttl
+
+    def remember(self, key: str, vector: list, created_at: float):
+        """Put an entry in the in-process LRU, evicting the least recently used one if full."""
+        self.memory[key] = (vector, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+
+    def get(self, text: str, model_name: str):
+        """
+        Look up the embedding of `text` for `model_name`.
+
+        Returns:
+            list[float] | None: The cached vector, or None on a miss or expired entry.
+        """
+        key = make_embedding_key(text, model_name)
+        expired = False
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if not self.is_expired(entry[1]):
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self.memory[key]
+                expired = True
+
+            if self.path:
+                conn = self.connect()
+                row = conn.execute("SELECT vector, created_at FROM embedding_cache WHERE key=?", (key,)).fetchone()
+                if row is not None and self.is_expired(row[1]):
+                    conn.execute("DELETE FROM embedding_cache WHERE key=?", (key,))
+                    conn.commit()
+                    expired = True
+                    row = None
+                conn.close()
+                if row is not None:
+                    vector = json.loads(row[0])
+                    self.remember(key, vector, row[1])
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            self.expired += int(expired)
+        return None
+
+    def set(self, text: str, model_name: str, vector: list):
+        """Store the embedding of `text` for `model_name` in memory and, if enabled, on disk."""
+        key = make_embedding_key(text, model_name)
+        now = time.time()
+        with self.lock:
+            self.remember(key, vector, now)
+            if self.path:
+                conn = self.connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO embedding_cache (key, model_name, vector, created_at) VALUES (?, ?, ?, ?)",
+                    (key, model_name, json.dumps(vector), now),
+                )
+                conn.commit()
+                conn.close()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters of this process and the in-process cache size."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+# Shared cache used by query_twelve_labs
+embedding_cache = EmbeddingCache()
@@ -4,17 +4,111 @@ load_dotenv()
 import qdrant_client
 from twelvelabs import AsyncTwelveLabs, TwelveLabs
 import asyncio
-# Initialize an synchronous Qdrant client for database operations.
-qdrant_client_async = qdrant_client.QdrantClient(
-    url=os.getenv("QDRANT_URL2"),
-    api_key=os.getenv("QDRANT_API_KEY2"),
-    timeout=60.0,
+from pipelines.twelve_labs.embedding_cache import embedding_cache
+from qdrant_client.models import Prefetch, FusionQuery, Fusion, Filter, FieldCondition, MatchValue
+from pipelines.qdrant.qdrant_utils import (
+    build_segment_filter, collection_search_params, has_sparse_vectors, create_client, rollup_collection_name, SPARSE_VECTOR_NAME,
+    PUBLIC_PAYLOAD
 )
+from pipelines.qdrant.bm25 import bm25_query_vector
+
+# Marengo model used for both video and query embeddings
+EMBED_MODEL_NAME = "Marengo-retrieval-2.7"
+# Dense + BM25 search fused with RRF, on collections that have the sparse vector
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "true").lower() in ("1", "true", "yes")
+# Candidates per search fed into the fusion, as a multiple of top_k
+HYBRID_PREFETCH_FACTOR = int(os.getenv("HYBRID_PREFETCH_FACTOR", 4))
+# Two-stage search: find the best videos/chapters in the rollup collection first,
+# then search segments only inside them
+TWO_STAGE_SEARCH = os.getenv("TWO_STAGE_SEARCH", "false").lower() in ("1", "true", "yes")
+TWO_STAGE_LEVEL = os.getenv("TWO_STAGE_LEVEL", "chapter")
+TWO_STAGE_CANDIDATES = int(os.getenv("TWO_STAGE_CANDIDATES", 5))
+
+# Initialize an synchronous Qdrant client for database operations (backend from VECTOR_STORE_BACKEND).
+qdrant_client_async = create_client()
 
 # Initialize an synchronous Twelve Labs client
 twelve_labs_client = TwelveLabs(api_key=os.getenv("TWELVE_LABS_API_KEY"))
 
-def query_twelve_labs(query_text: str, collection_name: str, top_k: int = 3):
+def embed_text(text: str, model_name: str = EMBED_MODEL_NAME, use_cache: bool = True) -> list:
+    """
+    Embed a text query with TwelveLabs, reusing cached vectors for repeated queries.
+
+    Args:
+        text (str): The text to embed.
+        model_name (str): TwelveLabs embedding model.
+        use_cache (bool): Look up / store the vector in `embedding_cache`.
+
+    Returns:
+        list[float]: The text embedding.
+    """
+    if use_cache:
+        cached = embedding_cache.get(text, model_name)
+        if cached is not None:
+            return cached
+
+    query_embedding = twelve_labs_client.embed.create(
+        model_name=model_name,
+        text=text,
+    )
+
+    # Validate that the API returned a valid embedding.
+    if not query_embedding.text_embedding.segments:
+        raise ValueError("No embedding segments returned from TwelveLabs")
+
+    # Extract the numerical vector from the first segment of the response.
+    vector = list(query_embedding.text_embedding.segments[0].float_)
+
+    if use_cache:
+        embedding_cache.set(text, model_name, vector)
+    return vector
+
+def rollup_filter(vector: list, collection_name: str, level: str = TWO_STAGE_LEVEL,
+                  candidates: int = TWO_STAGE_CANDIDATES, video_url=None):
+    """
+    Coarse stage of the two-stage search: find the best videos or chapters by their rollup vectors.
+
+    Args:
+        vector (list[float]): Query embedding.
+        collection_name (str): The segment collection (its rollups live in the sibling collection).
+        level (str): "video" or "chapter".
+        candidates (int): Number of videos/chapters kept.
+        video_url (str | list[str], optional): Only consider these videos.
+
+    Returns:
+        Filter | None: Segment filter matching the winners, or None if there are no rollups.
+    """
+    rollup_collection = rollup_collection_name(collection_name)
+    if not qdrant_client_async.collection_exists(rollup_collection):
+        return None
+
+    level_filter = Filter(must=[FieldCondition(key="level", match=MatchValue(value=level))])
+    url_filter = build_segment_filter(video_url)
+    response = qdrant_client_async.query_points(
+        collection_name=rollup_collection,
+        query=vector,
+        query_filter=Filter(must=[f for f in (level_filter, url_filter) if f]),
+        search_params=collection_search_params(rollup_collection, qdrant_client_async),
+        limit=candidates,
+    )
+    if not response.points:
+        return None
+
+    # A segment qualifies if it belongs to any winner: the whole video, or the chapter's time range
+    winners = []
+    for point in response.points:
+        payload = point.payload
+        if level == "chapter":
+            # Strict bounds: segments of the neighbouring chapters only touch the chapter edges
+            winners.append(build_segment_filter(payload["url"], payload["start_offset_sec"], payload["end_offset_sec"],
+                                                strict=True))
+        else:
+            winners.append(build_segment_filter(payload["url"]))
+    return Filter(should=winners)
+
+def query_twelve_labs(query_text: str, collection_name: str, top_k: int = 3, video_url=None,
+                      start_sec: float = None, end_sec: float = None, embedding_option=None, hybrid: bool = HYBRID_SEARCH,
+                      two_stage: bool = TWO_STAGE_SEARCH):
     """
     Asynchronously generates a text embedding with TwelveLabs and uses it to
     query a Qdrant collection for similar video segments.
@@ -23,28 +117,54 @@ def query_twelve_labs(query_text: str, collection_name: str, top_k: int = 3):
         query_text (str): The text to search for.
         collection_name (str): The name of the Qdrant collection to search in.
         top_k (int): The maximum number of results to return.
+        video_url (str | list[str], optional): Only search segments of these videos (e.g. one course).
+        start_sec (float, optional): Only segments ending after this offset.
+        end_sec (float, optional): Only segments starting before this offset.
+        embedding_option (str | list[str], optional): Only "visual-text" and/or "audio" segments.
+        hybrid (bool): Fuse the dense search with a BM25 search over transcriptions (RRF),
+            in one `query_points` request. Ignored for collections without the sparse vector.
+        two_stage (bool): Restrict the segment search to the best videos/chapters found in the
+            rollup collection first (see `rollup_filter`). Falls back to a full search without rollups.
 
     Returns:
-        A list of search results from Qdrant, or an empty list if an error occurs.
+        A list of segment payloads (without internal fields such as `payload_hash`),
+        or an empty list if an error occurs.
     """
     try:
-        query_embedding = twelve_labs_client.embed.create(
-            model_name="Marengo-retrieval-2.7",
-            text=query_text,
-        )
-
-        # Validate that the API returned a valid embedding.
-        if not query_embedding.text_embedding.segments:
-            raise ValueError("No embedding segments returned from TwelveLabs")
-
-        # Extract the numerical vector from the first segment of the response.
-        vector = query_embedding.text_embedding.segments[0].float_
-
-        response = qdrant_client_async.query_points(
-            collection_name=collection_name,
-            query=vector,
-            limit=top_k,
-        )
+        # Repeated (or trivially rephrased) queries reuse the cached embedding
+        vector = embed_text(query_text)
+
+        # Filters are applied inside the HNSW search using the payload indexes
+        query_filter = build_segment_filter(video_url, start_sec, end_sec, embedding_option)
+        if two_stage:
+            coarse_filter = rollup_filter(vector, collection_name, video_url=video_url)
+            if coarse_filter is not None:
+                query_filter = Filter(must=[f for f in (query_filter, coarse_filter) if f])
+        sparse_vector = bm25_query_vector(query_text) if hybrid else None
+
+        if sparse_vector and sparse_vector.indices and has_sparse_vectors(collection_name, qdrant_client_async):
+            # Dense and lexical candidates are fused server-side with Reciprocal Rank Fusion
+            candidates = top_k * HYBRID_PREFETCH_FACTOR
+            params = collection_search_params(collection_name, qdrant_client_async)
+            response = qdrant_client_async.query_points(
+                collection_name=collection_name,
+                prefetch=[
+                    Prefetch(query=vector, filter=query_filter, params=params, limit=candidates),
+                    Prefetch(query=sparse_vector, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=candidates),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
+                with_payload=PUBLIC_PAYLOAD,
+                limit=top_k,
+            )
+        else:
+            response = qdrant_client_async.query_points(
+                collection_name=collection_name,
+                query=vector,
+                query_filter=query_filter,
+                search_params=collection_search_params(collection_name, qdrant_client_async),
+                with_payload=PUBLIC_PAYLOAD,
+                limit=top_k,
+            )
 
         points = response.points
         results = [p.payload for p in points]
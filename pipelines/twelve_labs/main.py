@@ -1,7 +1,12 @@
 import os
+import sys
 import json
+import time
+import threading
 from pipelines.twelve_labs.twelvelabs_utils import embed_and_store_video, extract_slides_from_url, url_to_id, download_video_from_url
 from pipelines.qdrant.qdrant_utils import qdrant, create_collection_if_not_exists
+from pipelines.twelve_labs.video_jobs import get_job, update_job, get_pending_jobs, job_lease, JOB_LEASE_SECONDS
+from pipelines.utils.kb_version import bump_kb_version
 
 # Define the path to the JSON file that acts as a registry for processed videos.
 JSON_FILE = "data/registry/videos.json"
@@ -12,8 +17,14 @@ def pipeline_twelvelabs(video_url: str, local_path: str):
     already been processed, and if not, it sends it to Twelve Labs for embedding
     and extracts its slides.
 
+    A video is added to the registry only after its ingest job is done, so a crashed
+    ingest is resumed (see `embed_and_store_video`) instead of being skipped.
+    The job is leased while it runs (see `job_lease`): if another worker is already
+    ingesting the same video, e.g. the startup resume, this call returns without work.
+
     Args:
         video_url (str): The public URL of the video to be processed.
+        local_path (str): Local copy of the video, used for slide extraction.
     """
     video_url = video_url
     # Define the Qdrant collection name and generate a unique ID for the video.
@@ -43,21 +54,85 @@ def pipeline_twelvelabs(video_url: str, local_path: str):
     # Check if the video's ID already exists in our registry to avoid reprocessing.
     exists = any(item.get("id") == external_id for item in data)
 
-    # Process the video only if it's new
-    if not exists:
-        # If the video is new, add its ID (hashed url video) to registry list.
-        data.append({"id": external_id})
-        # Write the updated list back to the JSON file.
-        with open(JSON_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        print("Video baru ditambahkan ke JSON")
-
-        # Process the video with TwelveLabs and store embeddings in Qdrant.
-        # temp_file = "temp_video.mp4"
-        # download_video_from_url(video_url, temp_file)
-        embed_and_store_video(video_url, local_path, collection, qdrant)
-    else:
+    # Registry entries written before job tracking have no job and count as done
+    job = get_job(external_id)
+    if exists and (job is None or job["status"] == "done"):
         print("Video sudah ada di JSON, tidak ditambahkan lagi")
+        return
+
+    with job_lease(external_id, video_url) as claimed:
+        if not claimed:
+            print(f"⚠️ Skip {external_id}: video sedang diproses oleh worker lain")
+            return
+
+        # Process the video with TwelveLabs and store embeddings in Qdrant (resumes an unfinished job).
+        try:
+            embed_and_store_video(video_url, local_path, collection, qdrant)
+        except Exception as e:
+            update_job(external_id, video_url, error=str(e))
+            raise
+
+        # Mark the video as processed only once every clip is stored
+        job = get_job(external_id)
+        if job and job["status"] == "done":
+            # Knowledge base changed: answers cached for the previous version are stale
+            bump_kb_version(f"video:{external_id}")
+            if not exists:
+                # Add its ID (hashed url video) to registry list.
+                data.append({"id": external_id})
+                # Write the updated list back to the JSON file.
+                with open(JSON_FILE, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=4)
+                print("Video baru ditambahkan ke JSON")
+
+def resume_pending_jobs(tmp_dir: str = "tmp"):
+    """
+    Resume every video ingest job that was interrupted (e.g. by a crash or pod restart).
+
+    The local copy of each video is downloaded again from its URL for slide extraction;
+    the Twelve Labs task/video_id and finished clips of the job are reused.
+    Leased jobs are being ingested by another worker (or were held by a process that
+    crashed, until its lease expires); they are checked again every JOB_LEASE_SECONDS
+    until they are done or free. Every job is attempted at most once per call.
+
+    Args:
+        tmp_dir (str): Directory for the temporary video downloads.
+    """
+    os.makedirs(tmp_dir, exist_ok=True)
+    attempted = set()
+    while True:
+        waiting = False
+        for job in get_pending_jobs():
+            if not job.get("video_url") or job["external_id"] in attempted:
+                continue
+            if job["leased"]:
+                waiting = True
+                continue
+
+            attempted.add(job["external_id"])
+            local_path = os.path.join(tmp_dir, f"{job['external_id']}.mp4")
+            try:
+                download_video_from_url(job["video_url"], local_path)
+                # Claims the job lease; returns at once if another worker got it first
+                pipeline_twelvelabs(job["video_url"], local_path)
+            except Exception as e:
+                print(f"⚠️ Skip resume {job['external_id']} karena error: {e}")
+            finally:
+                if os.path.exists(local_path):
+                    os.remove(local_path)
+
+        if not waiting:
+            return
+        time.sleep(JOB_LEASE_SECONDS)
+
+def resume_pending_jobs_in_background(tmp_dir: str = "tmp") -> threading.Thread:
+    """
+    Start `resume_pending_jobs` in a daemon thread, e.g. at app startup, so a restarted
+    app finishes the ingests it was running without blocking its own start.
+    """
+    thread = threading.Thread(target=resume_pending_jobs, args=(tmp_dir,), name="resume-video-jobs", daemon=True)
+    thread.start()
+    return thread
 
 import re
 def convert_drive_link_regex(url: str) -> str:
@@ -84,6 +159,11 @@ def convert_drive_link_regex(url: str) -> str:
 
 
 if __name__ == "__main__":
-    original_link = "https://drive.google.com/file/d/1oEEZl7XVLZ7spNKxYcMPuEG4_6MCHlNL/view?usp=sharing"
-    new_link_regex = convert_drive_link_regex(original_link)
-    pipeline_twelvelabs(video_url=new_link_regex)
+    # usage:
+    #   python -m pipelines.twelve_labs.main resume    # finish ingest jobs interrupted by a crash/restart
+    if sys.argv[1:2] == ["resume"]:
+        resume_pending_jobs()
+    else:
+        original_link = "https://drive.google.com/file/d/1oEEZl7XVLZ7spNKxYcMPuEG4_6MCHlNL/view?usp=sharing"
+        new_link_regex = convert_drive_link_regex(original_link)
+        pipeline_twelvelabs(video_url=new_link_regex)
@@ -0,0 +1,147 @@
+import os
+import uuid
+import numpy as np
+from qdrant_client.models import PointStruct, FilterSelector
+from pipelines.qdrant.qdrant_utils import (
+    QdrantBatchWriter, ROLLUP_PAYLOAD_INDEXES, build_segment_filter, create_collection_if_not_exists,
+    rollup_collection_name
+)
+
+# A chapter ends when the next segment's similarity to the chapter centroid drops below this value
+ROLLUP_CHAPTER_SIMILARITY = float(os.getenv("ROLLUP_CHAPTER_SIMILARITY", 0.8))
+# Chapter length bounds in seconds
+ROLLUP_CHAPTER_MIN_SEC = float(os.getenv("ROLLUP_CHAPTER_MIN_SEC", 60))
+ROLLUP_CHAPTER_MAX_SEC = float(os.getenv("ROLLUP_CHAPTER_MAX_SEC", 600))
+# Characters of transcription kept in a rollup payload
+ROLLUP_TEXT_CHARS = int(os.getenv("ROLLUP_TEXT_CHARS", 2000))
+
+def normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def merge_windows(segments: list) -> list:
+    """
+    Merge segments that share a time window (e.g. visual-text and audio) into one entry.
+
+    Args:
+        segments (list[dict]): Segments with "vector", "start", "end" and "transcription".
+
+    Returns:
+        list[dict]: One entry per window, sorted by start, with the mean of the normalized vectors.
+    """
+    windows = {}
+    for segment in segments:
+        key = (segment["start"], segment["end"])
+        entry = windows.setdefault(key, {"start": key[0], "end": key[1], "vectors": [], "texts": []})
+        entry["vectors"].append(normalize(np.asarray(segment["vector"], dtype=np.float32)))
+        if segment.get("transcription", "").strip():
+            entry["texts"].append(segment["transcription"].strip())
+
+    merged = []
+    for key in sorted(windows):
+        entry = windows[key]
+        merged.append({
+            "start": entry["start"],
+            "end": entry["end"],
+            "vector": normalize(np.mean(entry["vectors"], axis=0)),
+            "transcription": "\n".join(dict.fromkeys(entry["texts"])),
+        })
+    return merged
+
+def split_chapters(windows: list, similarity: float = ROLLUP_CHAPTER_SIMILARITY,
+                   min_sec: float = ROLLUP_CHAPTER_MIN_SEC, max_sec: float = ROLLUP_CHAPTER_MAX_SEC) -> list:
+    """
+    Group adjacent windows into chapters.
+
+    A new chapter starts when the next window is not similar enough to the running chapter
+    centroid (once the chapter is at least `min_sec` long), or when it would exceed `max_sec`.
+
+    Returns:
+        list[list[dict]]: Chapters in time order, each a list of windows.
+    """
+    chapters = []
+    for window in windows:
+        if chapters:
+            chapter = chapters[-1]
+            length = chapter[-1]["end"] - chapter[0]["start"]
+            centroid = normalize(np.mean([w["vector"] for w in chapter], axis=0))
+            topic_change = float(centroid @ window["vector"]) < similarity and length >= min_sec
+            too_long = window["end"] - chapter[0]["start"] > max_sec
+            if not (topic_change or too_long):
+                chapter.append(window)
+                continue
+        chapters.append([window])
+    return chapters
+
+def build_rollups(video_url: str, external_id: str, segments: list) -> list:
+    """
+    Build the video-level and chapter-level rollup points of one video.
+
+    Args:
+        video_url (str): The public URL of the video.
+        external_id (str): Video ID from `url_to_id`.
+        segments (list[dict]): Stored segments with "vector", "start", "end" and "transcription".
+
+    Returns:
+        list[PointStruct]: One "video" rollup and one "chapter" rollup per chapter.
+    """
+    windows = merge_windows(segments)
+    if not windows:
+        return []
+
+    def rollup(level: str, group: list) -> PointStruct:
+        start, end = group[0]["start"], group[-1]["end"]
+        text = "\n".join(w["transcription"] for w in group if w["transcription"])
+        return PointStruct(
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{external_id}:{level}:{start:.3f}:{end:.3f}")),
+            vector=normalize(np.mean([w["vector"] for w in group], axis=0)).tolist(),
+            payload={
+                "url": video_url,
+                "level": level,
+                "start_offset_sec": start,
+                "end_offset_sec": end,
+                "segment_count": len(group),
+                "transcription": text[:ROLLUP_TEXT_CHARS],
+            },
+        )
+
+    points = [rollup("video", windows)]
+    points.extend(rollup("chapter", chapter) for chapter in split_chapters(windows))
+    return points
+
+def store_rollups(video_url: str, external_id: str, segments: list, collection_name: str, qdrant_client) -> int:
+    """
+    Replace the rollups of one video in the rollup collection of `collection_name`.
+
+    Args:
+        video_url (str): The public URL of the video.
+        external_id (str): Video ID from `url_to_id`.
+        segments (list[dict]): Stored segments with "vector", "start", "end" and "transcription".
+        collection_name (str): The segment collection; rollups go to `rollup_collection_name(collection_name)`.
+        qdrant_client: An initialized Qdrant client instance.
+
+    Returns:
+        int: Number of rollup points written.
+    """
+    points = build_rollups(video_url, external_id, segments)
+    if not points:
+        return 0
+
+    rollup_collection = rollup_collection_name(collection_name)
+    create_collection_if_not_exists(
+        rollup_collection, vector_size=len(points[0].vector), sparse=False, payload_indexes=ROLLUP_PAYLOAD_INDEXES,
+        client=qdrant_client,
+    )
+
+    # Chapter boundaries may differ from the last ingest, drop the old rollups of this video first
+    qdrant_client.delete(
+        collection_name=rollup_collection,
+        points_selector=FilterSelector(filter=build_segment_filter(video_url)),
+        wait=True,
+    )
+    with QdrantBatchWriter(rollup_collection, client=qdrant_client) as writer:
+        for point in points:
+            writer.add(point)
+
+    print(f"Sukses simpan {len(points)} rollup (video + {len(points) - 1} chapter) ke '{rollup_collection}'")
+    return len(points)
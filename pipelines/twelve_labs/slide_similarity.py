@@ -0,0 +1,267 @@
+import os
+from collections import namedtuple
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+load_dotenv()
+
+# Perceptual hash size: a dHash of HASH_SIZE x HASH_SIZE bits per frame
+HASH_SIZE = int(os.getenv("SLIDE_HASH_SIZE", 16))
+# Brightness step (grey levels) a dHash cell must exceed to set its bit, so flat slide
+# background hashes to 0 instead of to noise (same-slide distance 0-32 without it, 0-4 with it)
+HASH_MARGIN = float(os.getenv("SLIDE_HASH_MARGIN", 1))
+# Tiers calibrated on blurred 720p slide frames (JPEG/MP4 compressed, sensor noise):
+# same slide 0-4 bits, pairs SSIM keeps together (> 0.97) at most 15, distinct slides
+# sharing a layout 3-55 (median 28), unrelated slides 13-72 (median 45).
+# Hamming distance at or below which a pair is a match candidate, confirmed by the pixel check
+HASH_MATCH_DISTANCE = int(os.getenv("SLIDE_HASH_MATCH_DISTANCE", 6))
+# Hamming distance at or above which two frames are treated as different slides without SSIM
+# (prunes ~85% of the pairs of a 156-frame deck, none of them an SSIM match)
+HASH_MISMATCH_DISTANCE = int(os.getenv("SLIDE_HASH_MISMATCH_DISTANCE", 24))
+# Cheap pixel check confirming hash matches: largest grey-level difference between
+# PIXEL_CHECK_WIDTH px wide downscales (same slide 1-4, new bullet or other slide from 59)
+PIXEL_CHECK_WIDTH = 64
+PIXEL_MATCH_TOLERANCE = int(os.getenv("SLIDE_PIXEL_TOLERANCE", 12))
+# Width of the downscaled thumbnails used for SSIM on borderline candidates, 0 = full resolution.
+# The default thresholds (0.97 / 0.98) are calibrated on full-resolution frames: thumbnails score
+# lower (a newly revealed bullet gives 0.980-0.988 at full resolution but 0.961-0.976 at 320 px),
+# so lower the thresholds accordingly when enabling thumbnails.
+THUMB_WIDTH = int(os.getenv("SLIDE_THUMB_WIDTH", 0))
+# Saved slides scored per SSIM call during deduplication
+SSIM_CANDIDATE_BATCH = int(os.getenv("SLIDE_CANDIDATE_BATCH", 8))
+# SSIM constants, identical to the `skimage.metrics.structural_similarity` defaults for uint8 images
+SSIM_WIN_SIZE = 7
+SSIM_DATA_RANGE = 255.0
+SSIM_K1 = 0.01
+SSIM_K2 = 0.03
+
+# Cheap representation of a preprocessed frame: perceptual hash, pixel-check image and SSIM thumbnail
+FrameSignature = namedtuple("FrameSignature", ["hash", "pixels", "thumb"])
+
+def dhash(frame_gray, hash_size: int = HASH_SIZE, margin: float = HASH_MARGIN) -> int:
+    """
+    Compute the difference hash (dHash) of a grayscale frame.
+
+    The frame is shrunk to `(hash_size + 1) x hash_size` pixels and every bit tells
+    whether a pixel is brighter than its left neighbour by more than `margin`.
+
+    Args:
+        frame_gray (np.ndarray): Grayscale frame.
+        hash_size (int): Number of rows/columns of the hash grid.
+        margin (float): Grey levels a step must exceed to count.
+
+    Returns:
+        int: The hash as a `hash_size * hash_size` bit integer.
+    """
+    small = cv2.resize(frame_gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA).astype(np.float32)
+    bits = ((small[:, 1:] - small[:, :-1]) > margin).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+def make_thumbnail(frame_gray, width: int = THUMB_WIDTH):
+    """
+    Downscale a grayscale frame for SSIM comparison, keeping its aspect ratio.
+    Frames that are already narrower than `width`, or any frame if `width` is 0, are returned unchanged.
+    """
+    h, w = frame_gray.shape[:2]
+    if width <= 0 or w <= width:
+        return frame_gray
+    return cv2.resize(frame_gray, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+
+def make_signature(frame_gray) -> FrameSignature:
+    """Build the signature of a preprocessed (blurred grayscale) frame."""
+    return FrameSignature(dhash(frame_gray), make_thumbnail(frame_gray, PIXEL_CHECK_WIDTH), make_thumbnail(frame_gray))
+
+def pixels_match(a: FrameSignature, b: FrameSignature, tolerance: int = PIXEL_MATCH_TOLERANCE) -> bool:
+    """Check whether no pixel of the downscaled frames differs by more than `tolerance` grey levels."""
+    return a.pixels.shape == b.pixels.shape and int(cv2.absdiff(a.pixels, b.pixels).max()) <= tolerance
+
+def box_filter(stack, win_size: int = SSIM_WIN_SIZE):
+    """
+    Mean over every `win_size` x `win_size` window of a stack of images.
+
+    Only windows that lie fully inside the image are kept ("valid" region), which is
+    exactly the area `skimage` averages over after cropping its filter borders.
+    Uses OpenCV's running-sum box filter (float32 output, double accumulation). For 8 pairs
+    of 720p frames `ssim_batch` takes ~0.4 s with it, against ~1.5 s with NumPy cumulative
+    sums and ~1.2 s for 8 `skimage` calls.
+
+    Args:
+        stack (np.ndarray): float32 images of shape (N, H, W).
+        win_size (int): Side of the square window.
+
+    Returns:
+        np.ndarray: float32 array of shape (N, H - win_size + 1, W - win_size + 1).
+    """
+    r = win_size // 2
+    n, h, w = stack.shape
+    out = np.empty((n, h - 2 * r, w - 2 * r), dtype=np.float32)
+    for i, image in enumerate(stack):
+        # The border mode only affects the cropped margin
+        filtered = cv2.boxFilter(image, cv2.CV_32F, (win_size, win_size), normalize=True, borderType=cv2.BORDER_REFLECT)
+        out[i] = filtered[r:h - r, r:w - r]
+    return out
+
+def to_stack(thumbs) -> np.ndarray:
+    """Stack equally sized thumbnails into a (N, H, W) float32 array."""
+    return np.stack(thumbs).astype(np.float32)
+
+def ssim_batch(a, b, win_size: int = SSIM_WIN_SIZE, data_range: float = SSIM_DATA_RANGE) -> np.ndarray:
+    """
+    Mean SSIM for many image pairs at once.
+
+    Uses the same formula as `skimage.metrics.structural_similarity` with its default
+    arguments (7x7 uniform window, sample covariance, K1=0.01, K2=0.03), so scores keep
+    the meaning of `change_threshold` and `deduplication_threshold`.
+    Stacks broadcast against each other, e.g. one query (1, H, W) against saved slides (M, H, W).
+
+    Args:
+        a (np.ndarray): float32 stack of shape (N, H, W) or (1, H, W).
+        b (np.ndarray): float32 stack of shape (N, H, W) or (1, H, W).
+        win_size (int): Side of the square window.
+        data_range (float): Value range of the input images.
+
+    Returns:
+        np.ndarray: SSIM score per pair, shape (N,).
+    """
+    # (Co)variances do not change under a shift; centering the pixel values keeps
+    # E[x^2] - E[x]^2 from cancelling in float32 on bright frames
+    shift = data_range / 2
+    a, b = np.broadcast_arrays(a - shift, b - shift)
+    ux = box_filter(a, win_size)
+    uy = box_filter(b, win_size)
+    uxx = box_filter(a * a, win_size)
+    uyy = box_filter(b * b, win_size)
+    uxy = box_filter(a * b, win_size)
+
+    # Unbiased (sample) variances and covariance, as in skimage
+    np_window = win_size * win_size
+    cov_norm = np_window / (np_window - 1)
+    vx = cov_norm * (uxx - ux * ux)
+    vy = cov_norm * (uyy - uy * uy)
+    vxy = cov_norm * (uxy - ux * uy)
+
+    c1 = (SSIM_K1 * data_range) ** 2
+    c2 = (SSIM_K2 * data_range) ** 2
+    ux, uy = ux + shift, uy + shift
+    s = ((2 * ux * uy + c1) * (2 * vxy + c2)) / ((ux * ux + uy * uy + c1) * (vx + vy + c2))
+    return s.reshape(s.shape[0], -1).mean(axis=1, dtype=np.float64)
+
+class HashIndex:
+    """
+    Hamming-radius lookup over perceptual hashes, by a linear scan.
+
+    The scan costs ~7 us per 78 saved slides (`int.bit_count`), nothing next to one
+    full-resolution SSIM (~50 ms); what keeps deduplication near-linear is that the
+    radius drops most saved slides before SSIM. A BK-tree does not pay off: slides of
+    one deck sit close together, so a query at the default radius (23) still visited
+    61 of 78 nodes and took ~20 us.
+    """
+
+    def __init__(self):
+        self.entries = []   # (hash, item) pairs
+
+    def add(self, hash_value: int, item):
+        """Insert a hash and its associated item."""
+        self.entries.append((hash_value, item))
+
+    def search(self, hash_value: int, radius: int) -> list:
+        """
+        Find all items whose hash is within `radius` of `hash_value`.
+
+        Returns:
+            list[tuple[int, Any]]: (distance, item) pairs sorted by distance.
+        """
+        matches = []
+        for saved_hash, item in self.entries:
+            distance = hamming(hash_value, saved_hash)
+            if distance <= radius:
+                matches.append((distance, item))
+        return sorted(matches, key=lambda m: m[0])
+
+    def __len__(self):
+        return len(self.entries)
+
+class SlideComparator:
+    """
+    Tiered similarity check used by slide change detection and deduplication.
+
+    1. Perceptual hashes decide the obvious cases: a Hamming distance at or above
+       `mismatch_distance` is a non-match, one at or below `match_distance` is a
+       match if the pixel check (`pixels_match`) agrees. Hashes alone cannot make
+       matches: distinct slides sharing a layout can hash only a few bits apart.
+    2. All other pairs are scored with SSIM (full resolution unless `THUMB_WIDTH`
+       is set), in one vectorized `ssim_batch` call per batch of frames or candidates.
+
+    A deduplication check only runs SSIM against saved slides whose hash is close
+    enough to be a candidate (see `HashIndex`), closest first.
+    """
+
+    def __init__(self, change_threshold: float = 0.97, deduplication_threshold: float = 0.98,
+                 match_distance: int = HASH_MATCH_DISTANCE, mismatch_distance: int = HASH_MISMATCH_DISTANCE,
+                 candidate_batch: int = SSIM_CANDIDATE_BATCH):
+        self.change_threshold = change_threshold
+        self.candidate_batch = candidate_batch
+        self.deduplication_threshold = deduplication_threshold
+        self.match_distance = match_distance
+        self.mismatch_distance = mismatch_distance
+        self.index = HashIndex()
+
+    def change_flags(self, previous: FrameSignature, signatures: list) -> list:
+        """
+        Check a run of sampled frames for slide changes.
+
+        Args:
+            previous (FrameSignature): The frame sampled right before `signatures[0]`.
+            signatures (list[FrameSignature]): Consecutive sampled frames.
+
+        Returns:
+            list[bool]: For every frame, whether it shows a different slide than the frame before it.
+        """
+        pairs = list(zip([previous] + signatures[:-1], signatures))
+        flags = []
+        borderline = []
+        for k, (a, b) in enumerate(pairs):
+            distance = hamming(a.hash, b.hash)
+            flags.append(distance >= self.mismatch_distance)
+            if distance < self.mismatch_distance and not (distance <= self.match_distance and pixels_match(a, b)):
+                borderline.append(k)
+
+        # Score all borderline pairs of the batch at once
+        if borderline:
+            scores = ssim_batch(
+                to_stack([pairs[k][0].thumb for k in borderline]),
+                to_stack([pairs[k][1].thumb for k in borderline]),
+            )
+            for k, score in zip(borderline, scores):
+                flags[k] = bool(score < self.change_threshold)
+        return flags
+
+    def is_change(self, previous: FrameSignature, current: FrameSignature) -> bool:
+        """Check whether two consecutive sampled frames show different slides."""
+        return self.change_flags(previous, [current])[0]
+
+    def is_duplicate(self, signature: FrameSignature) -> bool:
+        """Check whether a frame matches one of the slides added with `add`."""
+        candidates = self.index.search(signature.hash, self.mismatch_distance - 1)
+        if not candidates:
+            return False
+        if any(distance <= self.match_distance and pixels_match(signature, saved) for distance, saved in candidates):
+            return True
+
+        # Score the closest candidates first, a few at a time, and stop at the first match;
+        # this bounds the memory of full-resolution SSIM when many slides are candidates
+        query = to_stack([signature.thumb])
+        for k in range(0, len(candidates), self.candidate_batch):
+            batch = candidates[k:k + self.candidate_batch]
+            scores = ssim_batch(query, to_stack([saved.thumb for _, saved in batch]))
+            if (scores > self.deduplication_threshold).any():
+                return True
+        return False
+
+    def add(self, signature: FrameSignature):
+        """Remember a saved slide for later deduplication checks."""
+        self.index.add(signature.hash, signature)
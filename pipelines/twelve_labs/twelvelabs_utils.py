@@ -5,16 +5,26 @@ import requests
 import hashlib
 import uuid
 import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from twelvelabs import TwelveLabs
 from twelvelabs.indexes import IndexesCreateRequestModelsItem
 from twelvelabs.tasks import TasksRetrieveResponse
-from qdrant_client.models import PointStruct
-from pipelines.cognee.utils.upload_to_gcs import upload_file
+from qdrant_client.models import PointStruct, PointIdsList
+from pipelines.cognee.utils.upload_to_gcs import upload_file, content_hash
 from pipelines.cognee.utils.describe_image_llm import describe_image_llm
+from pipelines.twelve_labs.slide_similarity import SlideComparator, make_signature
+from pipelines.qdrant.qdrant_utils import QdrantBatchWriter, SPARSE_VECTOR_NAME, has_sparse_vectors, build_segment_filter
+from pipelines.qdrant.bm25 import bm25_document_vector
+from pipelines.twelve_labs.rollups import store_rollups
+from pipelines.utils.retry import retry_with_backoff
+from pipelines.twelve_labs.video_jobs import get_job, update_job, save_clip_text, load_clip_texts
+from pipelines.twelve_labs.video_cache import (
+    load_index_id, save_index_id, from_retrieve_result, save_video_embeddings, load_video_embeddings
+)
 
-from skimage.metrics import structural_similarity as ssim
-from moviepy import VideoFileClip
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -23,6 +33,14 @@ BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME")
 client = TwelveLabs(api_key=os.getenv("TWELVE_LABS_API_KEY"))
 TMP_DIR = "tmp"  # Temporary directory for file processing
 CACHE_FILE = os.path.join(TMP_DIR, "extracted_image_cache.json")
+# Worker pool sizes for clip processing (CPU: cut/SSIM, I/O: GCS/LLM)
+CLIP_CPU_WORKERS = int(os.getenv("CLIP_CPU_WORKERS", 2))
+CLIP_IO_WORKERS = int(os.getenv("CLIP_IO_WORKERS", 8))
+# How frames between two slide checks are skipped: "read", "grab" or "seek"
+SAMPLING_MODES = ("read", "grab", "seek")
+FRAME_SAMPLING = os.getenv("FRAME_SAMPLING", "grab")
+# Number of sampled frames compared in one batched SSIM call
+SLIDE_BATCH_SIZE = int(os.getenv("SLIDE_BATCH_SIZE", 8))
 
 def url_to_id(url: str):
     """
@@ -33,13 +51,79 @@ def url_to_id(url: str):
     """
     return hashlib.md5(url.encode()).hexdigest()
 
+def segment_point_id(external_id: str, start: float, end: float, embedding_option: str) -> str:
+    """
+    Deterministic Qdrant point ID of one video segment.
+
+    The same segment of the same video always maps to the same UUID, and different
+    videos never collide, so re-ingesting a video overwrites its own points only.
+    The embedding option is part of the key because visual and audio segments share offsets.
+
+    Args:
+        external_id (str): Video ID from `url_to_id`.
+        start (float): Segment start offset in seconds.
+        end (float): Segment end offset in seconds.
+        embedding_option (str): e.g. "visual-text" or "audio".
+
+    Returns:
+        str: UUID string usable as a Qdrant point ID.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{external_id}:{start:.3f}:{end:.3f}:{embedding_option}"))
+
+def delete_legacy_points(video_url: str, collection_name: str, qdrant_client, batch_size: int = 256) -> int:
+    """
+    Delete the points of a video that were stored before `segment_point_id`.
+
+    Older ingests used the segment position (an integer) as point ID. Those points are
+    never overwritten by the UUID points of a re-ingest and would show up twice in search.
+
+    Args:
+        video_url (str): The public URL of the video.
+        collection_name (str): The segment collection.
+        qdrant_client: An initialized Qdrant client instance.
+        batch_size (int): Points fetched per scroll request.
+
+    Returns:
+        int: Number of deleted points.
+    """
+    legacy_ids, offset = [], None
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=build_segment_filter(video_url),
+            limit=batch_size,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        legacy_ids.extend(record.id for record in records if isinstance(record.id, int))
+        if offset is None:
+            break
+
+    if legacy_ids:
+        qdrant_client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=legacy_ids),
+            wait=True,
+        )
+        print(f"{len(legacy_ids)} point lama (ID integer) dihapus dari '{collection_name}'")
+    return len(legacy_ids)
+
 EXTRACTED_TEXT_FILE = os.path.join("data", f"text_extracted.json")
+_extracted_text_lock = threading.Lock()
 
 # contoh fungsi untuk simpan extracted_text ke JSON
 def save_extracted_text(start_sec, end_sec, extracted_text, file_path=EXTRACTED_TEXT_FILE):
     """
     Save extracted texts with start and end times per clip to JSON file
+
+    Concurrent ingests (e.g. the startup resume and a new upload) append under one lock,
+    and the file is swapped in atomically, so it is never read half-written.
     """
+    with _extracted_text_lock:
+        _append_extracted_text(start_sec, end_sec, extracted_text, file_path)
+
+def _append_extracted_text(start_sec, end_sec, extracted_text, file_path):
     data = []
     if os.path.exists(file_path):
         with open(file_path, "r", encoding="utf-8") as f:
@@ -56,23 +140,67 @@ def save_extracted_text(start_sec, end_sec, extracted_text, file_path=EXTRACTED_
     })
 
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, "w", encoding="utf-8") as f:
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
 
-def embed_and_store_video(video_url: str, temp_file:str, collection_name: str, qdrant_client):
+def split_windows(windows: list, parts: int) -> list:
     """
-    Processes a video with TwelveLabs to get embeddings and transcriptions,
-    then stores the resulting data into a Qdrant collection.
+    Split segment windows into contiguous groups of distinct windows, one per CPU worker.
+
+    Identical windows always land in the same group, so they share one detector.
 
     Args:
-        video_url (str): The public URL of the video to be processed.
-        collection_name (str): The name of the Qdrant collection where the data will be stored.
-        qdrant_client: An initialized Qdrant client instance.
+        windows (list[tuple[float, float]]): Segment windows in seconds.
+        parts (int): Maximum number of groups.
+
+    Returns:
+        list[list[tuple[float, float]]]: Groups of distinct windows ordered by start time.
+    """
+    distinct = sorted(set(windows))
+    size = max(1, -(-len(distinct) // max(1, parts)))
+    return [distinct[k:k + size] for k in range(0, len(distinct), size)]
+
+def describe_slide(img_path: str, dest_path: str) -> str:
+    """
+    Upload a slide image to GCS and describe it with the LLM.
+
+    The upload is content-addressed, so a slide already uploaded by another clip
+    or video is not sent again and never overwrites a different slide.
+
+    Args:
+        img_path (str): Local path of the slide image.
+        dest_path (str): Destination object key inside the bucket; the file name is replaced by the content hash.
+
+    Returns:
+        str: LLM description of the slide.
+    """
+    gcs_url = upload_file(img_path, BUCKET_NAME, dest_path, content_addressed=True)
+    return describe_image_llm(gcs_url=gcs_url)
+
+def is_index_not_found(error: Exception) -> bool:
+    """Check whether a Twelve Labs error says the index does not exist (e.g. the cached index was deleted)."""
+    if getattr(error, "status_code", None) == 404:
+        return True
+    message = str(getattr(error, "body", None) or error).lower()
+    return "index" in message and any(text in message for text in ("not_found", "not found", "not exist"))
+
+def get_index_id(refresh: bool = False) -> str:
+    """
+    Return the ID of the Twelve Labs index used for videos, creating the index if none exists.
+
+    The ID is cached locally (see `video_cache`), so the index list is only fetched
+    on the first ingest or when `refresh` is set (e.g. the cached index was deleted).
     """
+    index_id = None if refresh else load_index_id()
+    if index_id:
+        return index_id
+
     # Retrieve an existing index from Twelve Labs
     index = client.indexes.list()
     index_id = None
-    
+
     # Use the first available index found
     for idx in index.items:
         index_id = idx.id
@@ -89,68 +217,140 @@ def embed_and_store_video(video_url: str, temp_file:str, collection_name: str, q
             )]
         )
         index_id = index.id
+    save_index_id(index_id)
+    return index_id
 
-    # Create a task in Twelve Labs to process the video from the given URL
-    task = client.tasks.create(index_id=index_id, video_url=video_url)
+def embed_and_store_video(video_url: str, temp_file:str, collection_name: str, qdrant_client,
+                          cpu_workers: int = CLIP_CPU_WORKERS, io_workers: int = CLIP_IO_WORKERS):
+    """
+    Processes a video with TwelveLabs to get embeddings and transcriptions,
+    then stores the resulting data into a Qdrant collection.
 
-    # Define a callback function to print the status of the task as it runs
-    def on_task_update(task: TasksRetrieveResponse):
-        print(f"  Status={task.status}")
+    Slides are extracted straight from `temp_file` by a segment-aware single pass
+    (no per-clip re-encoding), split over a bounded CPU worker pool, while a second
+    bounded pool handles GCS uploads and LLM descriptions. A failing part or slide
+    is skipped without affecting the others.
 
-    # Wait for the video processing task to complete, using the callback for updates
-    task = client.tasks.wait_for_done(task_id=task.id, callback=on_task_update)
+    Progress is checkpointed in the video job store (see `video_jobs`) clip by clip: as
+    soon as the slides of a segment window are described, its clips are saved and their
+    points sent to Qdrant, while the rest of the video is still being processed. After a
+    crash the job reuses its Twelve Labs task / video_id, skips clips whose slide
+    descriptions are already saved, and only rewrites points that changed. The job is
+    "done" once every clip is stored; otherwise it stays pending and the next call picks
+    up the rest.
 
-    # Retrieve the results: video embeddings and transcription
-    result = client.indexes.videos.retrieve(
-        index_id=index_id,
-        video_id=task.video_id,
-        embedding_option=["visual-text", "audio"],
-        transcription=True
-    )
+    The retrieved segment embeddings and transcription are cached on disk by the content
+    hash of `temp_file` (see `video_cache`), so processing the same video again, e.g. to
+    redo its slides or rebuild the collection, needs no Twelve Labs task or retrieve call.
 
-    points = []
-    # Iterate through each video segment (clip) that has an embedding
-    for i, clip in enumerate(result.embedding.video_embedding.segments):
+    Args:
+        video_url (str): The public URL of the video to be processed.
+        collection_name (str): The name of the Qdrant collection where the data will be stored.
+        qdrant_client: An initialized Qdrant client instance.
+        cpu_workers (int): Maximum number of video parts scanned for slides concurrently.
+        io_workers (int): Maximum number of concurrent slide uploads/LLM calls.
+    """
+    external_id = url_to_id(video_url)
+    job = get_job(external_id) or {}
+    index_id = job.get("index_id")
+    video_id = job.get("video_id")
+    video_hash = content_hash(temp_file)
+    cached = load_video_embeddings(video_hash)
+
+    if cached:
+        # Same video content was retrieved before, skip the Twelve Labs round trip
+        print(f"Embedding video {external_id} diambil dari cache")
+        if not video_id:
+            index_id, video_id = cached["index_id"], cached["video_id"]
+            update_job(external_id, video_url, "indexed", index_id=index_id, video_id=video_id)
+    elif video_id:
+        # Resume: the video is already indexed, reuse its Twelve Labs video_id
+        print(f"Resume job {external_id} dari status '{job['status']}'")
+    else:
+        task_id = job.get("task_id")
+        if task_id:
+            # Resume: the task was created before the restart, wait for it instead of re-uploading
+            print(f"Resume task {task_id}")
+        else:
+            index_id = get_index_id()
+
+            # Create a task in Twelve Labs to process the video from the given URL;
+            # rate limits and transient errors are retried with backoff
+            try:
+                task = retry_with_backoff(client.tasks.create, index_id=index_id, video_url=video_url)
+            except Exception as e:
+                if not is_index_not_found(e):
+                    raise
+                # The cached index no longer exists, look it up again once
+                print(f"⚠️ Index {index_id} tidak ditemukan, cek ulang index: {e}")
+                index_id = get_index_id(refresh=True)
+                task = retry_with_backoff(client.tasks.create, index_id=index_id, video_url=video_url)
+            task_id = task.id
+            update_job(external_id, video_url, "task_created", index_id=index_id, task_id=task_id)
+
+        # Define a callback function to print the status of the task as it runs
+        def on_task_update(task: TasksRetrieveResponse):
+            print(f"  Status={task.status}")
+
+        # Wait for the video processing task to complete, using the callback for updates
+        task = client.tasks.wait_for_done(task_id=task_id, callback=on_task_update)
+        if task.status != "ready":
+            # Forget the failed task, so the next attempt creates a new one
+            update_job(external_id, task_id="", error=f"Task {task_id} status {task.status}")
+            raise RuntimeError(f"Twelve Labs task {task_id} status {task.status}")
+        video_id = task.video_id
+        update_job(external_id, video_url, "indexed", video_id=video_id)
+
+    if cached:
+        segments, transcript_lines = cached["segments"], cached["transcription"]
+    else:
+        # Retrieve the results: video embeddings and transcription
+        result = client.indexes.videos.retrieve(
+            index_id=index_id,
+            video_id=video_id,
+            embedding_option=["visual-text", "audio"],
+            transcription=True
+        )
+        segments, transcript_lines = from_retrieve_result(result)
+        save_video_embeddings(video_hash, index_id, video_id, segments, transcript_lines)
+
+    windows = [(clip.start_offset_sec, clip.end_offset_sec) for clip in segments]
+    slides_dir = os.path.join(TMP_DIR, external_id)
+
+    # Stream points to Qdrant in parallel batches; clips that failed below are skipped
+    # Segments whose payload is unchanged since the last ingest are not rewritten
+    writer = QdrantBatchWriter(collection_name, client=qdrant_client, skip_unchanged=True)
+    # Hybrid collections also get a BM25 sparse vector of the transcription
+    sparse = has_sparse_vectors(collection_name, qdrant_client)
+    # Stored segments, rolled up into video/chapter vectors afterwards
+    stored_segments = []
+
+    def store_clip(i: int, extracted_texts: str):
+        """Add the point of segment `i` to the writer."""
         try:
+            clip = segments[i]
             vector = clip.float_
             start = clip.start_offset_sec
             end = clip.end_offset_sec
             option = clip.embedding_option
             scope = clip.embedding_scope
 
-            temp_clip_file = os.path.join(TMP_DIR, f"clip_{i}.mp4")
-            img_clip_dir = os.path.join(TMP_DIR, f"clips_{i}")
-            os.makedirs(img_clip_dir, exist_ok=True)
-
-            # cut video
-            cut_video(temp_file, temp_clip_file, start, end)
-
-            # extract slides
-            extract_slides(temp_clip_file, img_clip_dir)
-
-            # proses extracted images
-            extracted_texts = ""
-            for img_file in os.listdir(img_clip_dir):
-                try:
-                    img_path = os.path.join(img_clip_dir, img_file)
-                    gcs_url = upload_file(img_path, BUCKET_NAME, f"clips/{img_file}")
-                    text = describe_image_llm(gcs_url=gcs_url)
-                    extracted_texts += f"\n{text}"
-                except Exception as e:
-                    print(f"⚠️ Skip image {img_file} karena error: {e}")
-
             save_extracted_text(start, end, extracted_texts)
 
             # transcription sesuai timeframe
             clip_transcriptions = [
-                t.value for t in result.transcription if t.start >= start and t.end <= end
+                t.value for t in transcript_lines if t.start >= start and t.end <= end
             ]
             text = " ".join(clip_transcriptions)
+            transcription = text + "\n" + extracted_texts
+            stored_segments.append({"vector": vector, "start": start, "end": end, "transcription": transcription})
+            if sparse:
+                vector = {"": vector, SPARSE_VECTOR_NAME: bm25_document_vector(transcription)}
 
             # build PointStruct
-            points.append(
+            writer.add(
                 PointStruct(
-                    id=i,
+                    id=segment_point_id(external_id, start, end, option),
                     vector=vector,
                     payload={
                         "url": video_url,
@@ -158,23 +358,306 @@ def embed_and_store_video(video_url: str, temp_file:str, collection_name: str, q
                         "end_offset_sec": end,
                         "embedding_option": option,
                         "embedding_scope": scope,
-                        "transcription": text + "\n" + extracted_texts,
+                        "transcription": transcription,
                     }
                 )
             )
-
+            return True
         except Exception as e:
             print(f"⚠️ Skip clip {i} karena error: {e}")
-            continue
+            return False
+
+    # Clips described before a restart are not processed again, only (re)written
+    saved_texts = load_clip_texts(external_id)
+    stored_clips = set()
+    for i, (start, end) in enumerate(windows):
+        if (start, end, i) in saved_texts and store_clip(i, saved_texts[(start, end, i)]):
+            stored_clips.add(i)
+    writer.flush()
+    pending_windows = [window for i, window in enumerate(windows) if (window[0], window[1], i) not in saved_texts]
+    if saved_texts:
+        print(f"{len(stored_clips)} clip sudah dideskripsikan, sisa {len(pending_windows)} clip")
+
+    # Segment indices waiting for the slides of each window (visual and audio segments share windows)
+    window_clips = {}
+    for i, window in enumerate(windows):
+        if (window[0], window[1], i) not in saved_texts:
+            window_clips.setdefault(window, []).append(i)
+
+    # CPU-bound work (frame decode + SSIM) and I/O-bound work (GCS + LLM) run in
+    # separate bounded pools. Each CPU worker walks its own contiguous part of the
+    # video once and reports every window as soon as it closes; its slides are
+    # described right away, and once the last description of a window arrives its
+    # clips are checkpointed and their points sent to Qdrant. Only this thread
+    # touches the checkpoint store and the writer; workers talk to it through `events`.
+    events = queue.Queue()
+    window_slides = {}      # window -> slide paths, in slide order
+    describe_futures = {}   # slide path -> description future
+    remaining = {}          # window -> descriptions still running
+
+    def finish_window(window):
+        """Checkpoint the clips of a fully described window and write their points."""
+        extracted_texts = ""
+        complete = True
+        for img_path in window_slides[window]:
+            try:
+                extracted_texts += f"\n{describe_futures[img_path].result()}"
+            except Exception as e:
+                complete = False
+                print(f"⚠️ Skip image {os.path.basename(img_path)} karena error: {e}")
+        for i in window_clips.get(window, []):
+            # Only fully described clips are checkpointed; the others are retried on resume
+            if complete:
+                save_clip_text(external_id, i, window[0], window[1], extracted_texts)
+            if store_clip(i, extracted_texts) and complete:
+                stored_clips.add(i)
+        writer.flush()
+
+    def start_window(window, slide_paths, io_pool):
+        if window in window_slides:
+            return
+        window_slides[window] = slide_paths
+        if not slide_paths:
+            finish_window(window)
+            return
+        remaining[window] = len(slide_paths)
+        for img_path in slide_paths:
+            dest_path = f"clips/{os.path.basename(img_path)}"
+            future = io_pool.submit(describe_slide, img_path, dest_path)
+            future.add_done_callback(lambda _, w=window: events.put(("described", w, None)))
+            describe_futures[img_path] = future
+
+    with ThreadPoolExecutor(max_workers=cpu_workers) as cpu_pool, \
+            ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+        groups = split_windows(pending_windows, cpu_workers)
+        for group in groups:
+            future = cpu_pool.submit(
+                extract_slides_by_segment, temp_file, group, slides_dir,
+                on_window=lambda window, slide_paths: events.put(("slides", window, slide_paths)),
+            )
+            future.add_done_callback(lambda f, g=group: events.put(("part", g, f)))
+
+        open_parts = len(groups)
+        while open_parts or remaining:
+            kind, key, value = events.get()
+            if kind == "slides":
+                start_window(key, value, io_pool)
+            elif kind == "described":
+                remaining[key] -= 1
+                if not remaining[key]:
+                    del remaining[key]
+                    finish_window(key)
+            else:
+                # A part is done; windows it did not report (e.g. past the end of the video) come from its result
+                open_parts -= 1
+                try:
+                    for window, slide_paths in zip(key, value.result()):
+                        start_window(window, slide_paths, io_pool)
+                except Exception as e:
+                    print(f"⚠️ Skip clips {key[0]}-{key[-1]} karena error: {e}")
+
+    # Clips that failed (or miss slide descriptions) stay pending and are retried when the job is resumed
+    missing_clips = len(windows) - len(stored_clips)
+    if not missing_clips:
+        update_job(external_id, status="described")
+
+    # Wait until every batch is written (final barrier)
+    stats = writer.close()
+    print(f"Sukses simpan {stats['written']} clip ke Qdrant di koleksi '{collection_name}' "
+          f"({stats['unchanged']} tidak berubah, {stats['failed']} gagal)")
+
+    if missing_clips or stats["failed"]:
+        update_job(external_id, error=f"{missing_clips} clip gagal, {stats['failed']} point gagal disimpan")
+        return index_id
+    # Every segment now has its UUID point, drop the duplicates left by integer-ID ingests
+    delete_legacy_points(video_url, collection_name, qdrant_client)
+    update_job(external_id, status="upserted")
+
+    # Video-level and chapter-level rollups for two-stage search
+    try:
+        store_rollups(video_url, external_id, stored_segments, collection_name, qdrant_client)
+    except Exception as e:
+        print(f"⚠️ Skip rollup karena error: {e}")
+    update_job(external_id, status="done")
 
+    return index_id
 
-    # Upsert (update or insert) all the created points into the specified Qdrant collection
-    qdrant_client.upsert(collection_name=collection_name, points=points)
-    print(f"Sukses simpan {len(points)} clip ke Qdrant di koleksi '{collection_name}'")
+def preprocess_frame(frame):
+    """
+    Convert a BGR frame into the blurred grayscale image used for slide comparison.
 
-    return index_id
+    Args:
+        frame (np.ndarray): Color frame as returned by OpenCV.
 
-def extract_slides(video_path, output_dir, checks_per_second=1, change_threshold=0.97, deduplication_threshold=0.98):
+    Returns:
+        np.ndarray: Grayscale frame blurred to reduce noise and focus on structural changes.
+    """
+    frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.GaussianBlur(frame_gray, (21, 21), 0)
+
+class SlideDetector:
+    """
+    Incremental slide change detector for one stream of sampled frames.
+
+    Frames are fed one at a time with `feed` and evaluated in batches of
+    `batch_size`, and `finish` flushes the final slide. A slide is saved when
+    consecutive frames differ (SSIM below `change_threshold`), unless it matches
+    an already saved slide (SSIM above `deduplication_threshold`). Comparisons go
+    through a `SlideComparator`, which settles obvious cases with perceptual hashes
+    (matches confirmed by a pixel check) and scores the rest with batched SSIM.
+    """
+
+    def __init__(self, output_dir: str, change_threshold: float = 0.97, deduplication_threshold: float = 0.98,
+                 batch_size: int = SLIDE_BATCH_SIZE):
+        self.output_dir = output_dir
+        self.comparator = SlideComparator(change_threshold, deduplication_threshold)
+        self.batch_size = batch_size
+
+        # Variables to hold state between frames.
+        self.pending = []                 # Sampled (color frame, signature) pairs not evaluated yet.
+        self.previous_signature = None    # Signature (hash, pixels, thumbnail) of the previously processed frame.
+        self.previous_frame_color = None  # The previously processed color frame (the one we'll save).
+        self.slide_paths = []             # Paths of the saved slides, in order.
+
+        # Ensure the output directory exists, creating it if necessary.
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+            print(f"Created directory: {output_dir}")
+
+    def save(self, frame_color, signature) -> str:
+        """Write a slide to disk and remember it for deduplication."""
+        filename = os.path.join(self.output_dir, f"slide_{len(self.slide_paths) + 1:04d}.png")
+        cv2.imwrite(filename, frame_color)
+        self.comparator.add(signature)
+        self.slide_paths.append(filename)
+        return filename
+
+    def feed(self, frame, frame_gray=None):
+        """
+        Queue the next sampled frame, evaluating the queue once it holds `batch_size` frames.
+
+        Args:
+            frame (np.ndarray): Color frame.
+            frame_gray (np.ndarray, optional): Pre-computed output of `preprocess_frame`.
+        """
+        if frame_gray is None:
+            frame_gray = preprocess_frame(frame)
+        self.pending.append((frame, make_signature(frame_gray)))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Evaluate all queued frames, saving the slides they reveal."""
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        # If this is the very first frame we're processing, save it as the first slide.
+        if self.previous_signature is None:
+            frame, signature = pending.pop(0)
+            filename = self.save(frame, signature)
+            print(f"✅ Found first slide! Saving as {filename}")
+            self.previous_signature = signature
+            self.previous_frame_color = frame
+            if not pending:
+                return
+
+        # Compare every queued frame with the one before it in a single batch.
+        changes = self.comparator.change_flags(self.previous_signature, [signature for _, signature in pending])
+        for (frame, signature), changed in zip(pending, changes):
+            # A significant change was detected. Check if the `previous_frame` (the last stable frame before the change) is a duplicate.
+            if changed and not self.comparator.is_duplicate(self.previous_signature):
+                filename = self.save(self.previous_frame_color, self.previous_signature)
+                print(f"✅ New slide detected! Saved as {filename}")
+
+            # Update the previous frame states for the next iteration.
+            self.previous_signature = signature
+            self.previous_frame_color = frame
+
+    def finish(self) -> list:
+        """
+        Evaluate the remaining frames and save the last stable frame if it is a new slide.
+
+        Returns:
+            list[str]: Paths of all slides saved by this detector.
+        """
+        self.flush()
+
+        # A slide is saved only when a change is detected, so the very last slide is never saved by `flush`. We handle that here.
+        if self.previous_signature is not None:
+            if not self.comparator.is_duplicate(self.previous_signature):
+                filename = self.save(self.previous_frame_color, self.previous_signature)
+                print(f"✅ Saved final slide as {filename}")
+            else:
+                print("Final slide was a duplicate of a previously saved slide. Nothing to save.")
+            self.previous_signature = None
+            self.previous_frame_color = None
+        return self.slide_paths
+
+def get_frames_to_skip(fps: float, checks_per_second: int) -> int:
+    """
+    Determine how many frames to skip between checks to meet the `checks_per_second` target.
+    If video FPS is lower than our target, we check every frame (skip=1).
+    """
+    if fps < checks_per_second:
+        return 1
+    return int(fps / checks_per_second)
+
+def skip_frames(cap, frame_number: int, target: int, sampling: str = FRAME_SAMPLING) -> int:
+    """
+    Advance a capture from `frame_number` to `target` without returning the skipped frames.
+
+    Sampling modes:
+        - "read": fully decode every skipped frame (original behaviour, kept for benchmarks).
+        - "grab": `cap.grab()` skipped frames, so they are never converted/copied into BGR images.
+        - "seek": jump straight to `target` with `cv2.CAP_PROP_POS_FRAMES`; the backend only
+          decodes from the nearest keyframe, which is cheapest for sparse sampling.
+
+    Args:
+        cap (cv2.VideoCapture): Opened video capture positioned at `frame_number`.
+        frame_number (int): Index of the next frame the capture would return.
+        target (int): Index of the next frame we want to read.
+        sampling (str): One of `SAMPLING_MODES`.
+
+    Returns:
+        int: New frame index. Smaller than `target` if the video ended first.
+    """
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"Unsupported sampling mode: {sampling}")
+
+    if sampling == "seek" and target - frame_number > 1:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        return target
+
+    while frame_number < target:
+        ok = cap.read()[0] if sampling == "read" else cap.grab()
+        if not ok:
+            break    # End of the video.
+        frame_number += 1
+    return frame_number
+
+def iter_sampled_frames(cap, frames_to_skip: int, sampling: str = FRAME_SAMPLING):
+    """
+    Yield every `frames_to_skip`-th frame of a capture, skipping the others with `skip_frames`.
+
+    Args:
+        cap (cv2.VideoCapture): Opened video capture.
+        frames_to_skip (int): Distance between two sampled frames.
+        sampling (str): One of `SAMPLING_MODES`.
+
+    Yields:
+        tuple[int, np.ndarray]: Frame index and the decoded color frame.
+    """
+    frame_number = 0
+    while True:
+        # Decode only the sampled frame (grab + retrieve).
+        ret, frame = cap.read()
+        if not ret:
+            break    # End of the video.
+        yield frame_number, frame
+        frame_number = skip_frames(cap, frame_number + 1, frame_number + frames_to_skip, sampling)
+
+def extract_slides(video_path, output_dir, checks_per_second=1, change_threshold=0.97, deduplication_threshold=0.98, sampling=FRAME_SAMPLING):
     """
     Extracts unique slides from a video presentation by sparsely sampling frames.
     
@@ -190,105 +673,138 @@ def extract_slides(video_path, output_dir, checks_per_second=1, change_threshold
         checks_per_second (int): The target number of frames to check per second.
         change_threshold (float): SSIM threshold to detect a new slide.
         deduplication_threshold (float): SSIM threshold to avoid saving duplicate slides.
-    """
-
-    # Ensure the output directory exists, creating it if necessary.
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created directory: {output_dir}")
+        sampling (str): How frames between two checks are skipped, see `skip_frames`.
 
+    Returns:
+        list[str]: Paths of the saved slides, or an empty list if the video cannot be opened.
+    """
     # Open the video file for processing.
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         print(f"Error: Could not open video file {video_path}")
-        return
+        return []
 
     # Get video properties (frame count and FPS).
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     fps = cap.get(cv2.CAP_PROP_FPS)
-
-    # Determine how many frames to skip between checks to meet the `checks_per_second` target.
-    # If video FPS is lower than our target, we check every frame (skip=1).
-    if fps < checks_per_second:
-        frames_to_skip = 1
-    else:
-        frames_to_skip = int(fps / checks_per_second)
+    frames_to_skip = get_frames_to_skip(fps, checks_per_second)
 
     print(f"Processing video: {total_frames} frames at {fps:.2f} FPS.")
-    print(f"🚀 Sampling: Checking 1 frame every {frames_to_skip} frames (approx. {checks_per_second} checks/sec).")
+    print(f"🚀 Sampling: Checking 1 frame every {frames_to_skip} frames (approx. {checks_per_second} checks/sec, mode={sampling}).")
 
-    # Variables to hold state between loops.
-    saved_slides_gray = []        # Stores grayscale versions of saved slides for efficient comparison.
-    previous_frame_gray = None    # The previously processed grayscale frame.
-    previous_frame_color = None   # The previously processed color frame (the one we'll save).
-    slide_count = 0               # Counter for saved slides.
-    frame_number = 0              # Counter for total frames processed.
+    detector = SlideDetector(output_dir, change_threshold, deduplication_threshold)
 
-    
-    while cap.isOpened():
-        # Read the next frame from the video.
+    # Only frames on our sampling interval are decoded and processed.
+    for _, frame in iter_sampled_frames(cap, frames_to_skip, sampling):
+        detector.feed(frame)
+
+    print("\nChecking for the final slide...")
+    slide_paths = detector.finish()
+    cap.release()
+    print(f"\n✨ Done! Extracted {len(slide_paths)} unique slides.")
+    return slide_paths
+
+def extract_slides_by_segment(video_path, windows, output_dir, checks_per_second=1, change_threshold=0.97, deduplication_threshold=0.98, sampling=FRAME_SAMPLING,
+                              on_window=None):
+    """
+    Extracts slides for many `[start_offset_sec, end_offset_sec)` windows in a single pass over the video.
+
+    Instead of re-encoding every segment into its own clip, the source file is decoded
+    once. Each sampled frame is fed to the detector of every window that contains it,
+    so overlapping windows (e.g. visual and audio segments) share the decode work, and
+    gaps between windows are skipped by seeking with `cv2.CAP_PROP_POS_MSEC`.
+    Identical windows share one detector and therefore the same slide files.
+
+    Args:
+        video_path (str): Path to the input video file.
+        windows (list[tuple[float, float]]): Segment windows in seconds.
+        output_dir (str): Root directory; slides of each window go to their own sub-folder.
+        checks_per_second (int): The target number of frames to check per second.
+        change_threshold (float): SSIM threshold to detect a new slide.
+        deduplication_threshold (float): SSIM threshold to avoid saving duplicate slides.
+        sampling (str): How frames between two checks are skipped, see `skip_frames`.
+        on_window (callable, optional): Called as `on_window(window, slide_paths)` as soon as a
+            window is finished, from the calling thread, so its slides can be processed while
+            the rest of the video is still being scanned.
+
+    Returns:
+        list[list[str]]: Slide paths for each window, aligned with `windows`.
+            Windows with `start >= end` or outside the video get an empty list.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open video file {video_path}")
+        return [[] for _ in windows]
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps:
+        print(f"Error: Could not read FPS of video file {video_path}")
+        cap.release()
+        return [[] for _ in windows]
+    frames_to_skip = get_frames_to_skip(fps, checks_per_second)
+
+    # One detector per distinct, non-empty window, activated in order of start time
+    pending = sorted({(start, end) for start, end in windows if start < end})
+    detectors = {
+        (start, end): SlideDetector(
+            os.path.join(output_dir, f"window_{int(start * 1000)}_{int(end * 1000)}"),
+            change_threshold,
+            deduplication_threshold,
+        )
+        for start, end in pending
+    }
+    active = []
+    frame_number = 0
+
+    while pending or active:
+        t = frame_number / fps
+
+        # Activate windows that have started and close the ones that have ended
+        while pending and pending[0][0] <= t:
+            active.append(pending.pop(0))
+        for window in [w for w in active if w[1] <= t]:
+            detectors[window].finish()
+            active.remove(window)
+            if on_window:
+                on_window(window, detectors[window].slide_paths)
+
+        if not active:
+            if not pending:
+                break
+            # No window covers the current position: jump to the next window start,
+            # seeking for long gaps and skipping frame by frame for short ones.
+            target = int(np.ceil(pending[0][0] * fps))
+            if target - frame_number > fps:
+                cap.set(cv2.CAP_PROP_POS_MSEC, pending[0][0] * 1000)
+                frame_number = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            frame_number = skip_frames(cap, frame_number, target, sampling)
+            if frame_number < target:
+                break    # End of the video.
+            continue
+
+        # Decode only the sampled frame (grab + retrieve).
         ret, frame = cap.read()
         if not ret:
             break    # End of the video.
 
-        # Only process the frame if it's on our sampling interval.
-        if frame_number % frames_to_skip == 0:
-            # Pre-process the frame for comparison: convert to grayscale and apply a blur to reduce noise and focus on structural changes.
-            current_frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            current_frame_gray = cv2.GaussianBlur(current_frame_gray, (21, 21), 0)
-
-            # If this is the very first frame we're processing, save it as the first slide.
-            if previous_frame_gray is None:
-                print("✅ Found first slide! Saving as slide_0001.png")
-                slide_count += 1
-                filename = os.path.join(output_dir, f"slide_{slide_count:04d}.png")
-                cv2.imwrite(filename, frame)
-                saved_slides_gray.append(current_frame_gray)
-            else:
-                # Compare the current frame with the previous one. A low SSIM score means the frames are different, indicating a potential slide change.
-                score, _ = ssim(previous_frame_gray, current_frame_gray, full=True)
-
-                if score < change_threshold:
-                    # A significant change was detected. Now check if this "new" slide is a duplicate.
-                    # We check the `previous_frame`, as it's the last stable frame before the change.
-                    is_duplicate = False
-                    for saved_slide in saved_slides_gray:
-                        dup_score, _ = ssim(previous_frame_gray, saved_slide, full=True)
-                        if dup_score > deduplication_threshold:
-                            is_duplicate = True
-                            break    # Found a duplicate, no need to check further.
-                    # If it's not a duplicate, save it.
-                    if not is_duplicate:
-                        slide_count += 1
-                        filename = os.path.join(output_dir, f"slide_{slide_count:04d}.png")
-                        cv2.imwrite(filename, previous_frame_color)
-                        print(f"✅ New slide detected! Saved as {filename}")
-                        saved_slides_gray.append(previous_frame_gray)
-                        
-            # Update the previous frame states for the next iteration.
-            previous_frame_gray = current_frame_gray
-            previous_frame_color = frame
+        frame_gray = preprocess_frame(frame)
+        for window in active:
+            detectors[window].feed(frame, frame_gray)
 
-        frame_number += 1
-    # The loop saves a slide only when a change is detected. This means the very last slide is never saved. We handle that here.
-    print("\nChecking for the final slide...")
-    if previous_frame_gray is not None:
-        is_duplicate = False
-        for saved_slide in saved_slides_gray:
-            dup_score, _ = ssim(previous_frame_gray, saved_slide, full=True)
-            if dup_score > deduplication_threshold:
-                is_duplicate = True
-                break
+        # Skip ahead to the next sampling point without decoding the frames in between.
+        frame_number = skip_frames(cap, frame_number + 1, frame_number + frames_to_skip, sampling)
 
-        if not is_duplicate:
-            slide_count += 1
-            filename = os.path.join(output_dir, f"slide_{slide_count:04d}.png")
-            cv2.imwrite(filename, previous_frame_color)
-            print(f"✅ Saved final slide as {filename}")
-        else:
-            print("Final slide was a duplicate of a previously saved slide. Nothing to save.")
+    # Flush windows that were still open when the video ended
+    for window in active:
+        detectors[window].finish()
+        if on_window:
+            on_window(window, detectors[window].slide_paths)
     cap.release()
-    print(f"\n✨ Done! Extracted {slide_count} unique slides.")
+
+    return [
+        detectors[(start, end)].slide_paths if start < end else []
+        for start, end in windows
+    ]
 
 def download_video_from_url(video_url, output_dir):
     """
@@ -318,30 +834,3 @@ def extract_slides_from_url(tmp_file, output_dir="slides"):
 
     os.remove(tmp_file)
     print("[*] Selesai, file sementara dihapus.")
-
-def cut_video(input_path: str, output_path: str, start: float, end: float):
-    """
-    Cuts a video from a local file based on the start and end times.
-    
-    Args:
-        input_path (str): Path to the original video file.
-        output_path (str): Path to save the resulting video clip.
-        start (float): The start time in seconds.
-        end (float): The end time in seconds.
-    """
-    if start < end:
-        # Load the original video file from the specified input path.
-        video = VideoFileClip(input_path)
-        
-        # Create a new clip by cutting the original video from the start to the end time.
-        clip = video.subclipped(start, end)
-        
-        # Save the newly created clip to the output path.
-        clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
-
-        # Explicitly close the video and clip objects to release file handles and free up memory.
-        video.close()
-        clip.close()
-    else:
-        print(f"⚠️ Skip clip karena start >= end (start={start}, end={end})")
-        return
\ No newline at end of file
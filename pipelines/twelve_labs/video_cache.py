@@ -0,0 +1,104 @@
+import os
+import json
+import shutil
+from collections import namedtuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Local copies of Twelve Labs results, keyed by the SHA-256 of the video file
+VIDEO_CACHE_DIR = os.getenv("VIDEO_CACHE_DIR", "data/cache/twelvelabs")
+# Twelve Labs index used for videos, so the index list is not fetched on every ingest
+INDEX_CACHE_FILE = os.getenv("TWELVE_LABS_INDEX_CACHE", "data/registry/twelvelabs_index.json")
+
+# Same attribute names as the Twelve Labs SDK objects, so cached and fresh results are interchangeable
+Segment = namedtuple("Segment", ["float_", "start_offset_sec", "end_offset_sec", "embedding_option", "embedding_scope"])
+TranscriptLine = namedtuple("TranscriptLine", ["value", "start", "end"])
+
+def load_index_id():
+    """Return the cached Twelve Labs index ID, or None."""
+    if os.path.exists(INDEX_CACHE_FILE):
+        with open(INDEX_CACHE_FILE, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f).get("index_id")
+            except json.JSONDecodeError:
+                return None
+    return None
+
+def save_index_id(index_id: str):
+    os.makedirs(os.path.dirname(INDEX_CACHE_FILE) or ".", exist_ok=True)
+    with open(INDEX_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"index_id": index_id}, f, indent=2)
+
+def from_retrieve_result(result):
+    """
+    Convert the result of `client.indexes.videos.retrieve` into plain segments and transcript lines.
+
+    Returns:
+        tuple[list[Segment], list[TranscriptLine]]
+    """
+    # Qdrant stores float32 anyway; rounding here keeps fresh and cached vectors identical,
+    # so a rerun from the cache does not see every point as changed (see `payload_hash`)
+    segments = [
+        Segment(np.asarray(s.float_, dtype=np.float32).tolist(), s.start_offset_sec, s.end_offset_sec, s.embedding_option, s.embedding_scope)
+        for s in result.embedding.video_embedding.segments
+    ]
+    transcription = [TranscriptLine(t.value, t.start, t.end) for t in (result.transcription or [])]
+    return segments, transcription
+
+def save_video_embeddings(video_hash: str, index_id: str, video_id: str, segments: list, transcription: list):
+    """
+    Store the segment embeddings of a video as `.npy` (float32 matrix) and the rest as JSON.
+
+    Args:
+        video_hash (str): SHA-256 of the video file.
+        index_id (str): Twelve Labs index holding the video.
+        video_id (str): Twelve Labs video ID.
+        segments (list[Segment]): Segments with their embeddings.
+        transcription (list[TranscriptLine]): Timed transcript lines.
+    """
+    cache_dir = os.path.join(VIDEO_CACHE_DIR, video_hash)
+    tmp_dir = f"{cache_dir}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    np.save(os.path.join(tmp_dir, "embeddings.npy"), np.asarray([s.float_ for s in segments], dtype=np.float32))
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "index_id": index_id,
+            "video_id": video_id,
+            "segments": [
+                {"start_offset_sec": s.start_offset_sec, "end_offset_sec": s.end_offset_sec,
+                 "embedding_option": s.embedding_option, "embedding_scope": s.embedding_scope}
+                for s in segments
+            ],
+            "transcription": [t._asdict() for t in transcription],
+        }, f, ensure_ascii=False)
+
+    # Swap the finished directory in, so a crash never leaves a half-written cache entry
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+def load_video_embeddings(video_hash: str):
+    """
+    Load cached Twelve Labs results of a video.
+
+    Returns:
+        dict | None: "index_id", "video_id", "segments" (list[Segment]) and
+            "transcription" (list[TranscriptLine]), or None if the video is not cached.
+    """
+    cache_dir = os.path.join(VIDEO_CACHE_DIR, video_hash)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    embeddings = np.load(os.path.join(cache_dir, "embeddings.npy"))
+
+    segments = [
+        Segment(embeddings[i].tolist(), s["start_offset_sec"], s["end_offset_sec"], s["embedding_option"], s["embedding_scope"])
+        for i, s in enumerate(meta["segments"])
+    ]
+    transcription = [TranscriptLine(**t) for t in meta["transcription"]]
+    return {"index_id": meta["index_id"], "video_id": meta["video_id"], "segments": segments, "transcription": transcription}
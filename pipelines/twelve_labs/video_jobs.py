@@ -0,0 +1,218 @@
+import os
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Durable state of video ingest jobs, so a crashed ingest resumes where it stopped
+VIDEO_JOBS_DB = os.getenv("VIDEO_JOBS_DB", "data/registry/video_jobs.db")
+
+# Job states in order: Twelve Labs task created -> video indexed (video_id known)
+# -> all clip descriptions saved -> points upserted -> rollups written (done)
+JOB_STATES = ("task_created", "indexed", "described", "upserted", "done")
+# Seconds a job stays claimed by its worker; the lease is renewed while the worker runs,
+# so after a crash the job can be resumed again once this much time has passed
+JOB_LEASE_SECONDS = int(os.getenv("VIDEO_JOB_LEASE_SECONDS", 120))
+
+
+def init_jobs_db():
+    os.makedirs(os.path.dirname(VIDEO_JOBS_DB) or ".", exist_ok=True)
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS video_jobs (
+            external_id TEXT PRIMARY KEY,
+            video_url TEXT,
+            status TEXT,
+            index_id TEXT,
+            task_id TEXT,
+            video_id TEXT,
+            error TEXT,
+            lease_owner TEXT,
+            lease_until TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Databases created before job leases
+    columns = {row[1] for row in c.execute("PRAGMA table_info(video_jobs)")}
+    for column, column_type in (("lease_owner", "TEXT"), ("lease_until", "TIMESTAMP")):
+        if column not in columns:
+            c.execute(f"ALTER TABLE video_jobs ADD COLUMN {column} {column_type}")
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS video_clips (
+            external_id TEXT,
+            clip_index INTEGER,
+            start_offset_sec REAL,
+            end_offset_sec REAL,
+            extracted_text TEXT,
+            PRIMARY KEY (external_id, clip_index)
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def get_job(external_id: str):
+    """
+    Return the ingest job of a video as a dict, or None if the video was never started.
+    """
+    init_jobs_db()
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM video_jobs WHERE external_id=?", (external_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def update_job(external_id: str, video_url: str = None, status: str = None, **fields):
+    """
+    Create or update the ingest job of a video.
+
+    Args:
+        external_id (str): Video ID from `url_to_id`.
+        video_url (str, optional): The public URL of the video.
+        status (str, optional): New state, one of JOB_STATES.
+        **fields: Other columns to set: index_id, task_id, video_id, error.
+    """
+    if status is not None and status not in JOB_STATES:
+        raise ValueError(f"Unknown job status '{status}', choose from {JOB_STATES}")
+    init_jobs_db()
+    values = {k: v for k, v in dict(video_url=video_url, status=status, **fields).items() if v is not None}
+    # A state change clears the error of the previous attempt
+    if status is not None and "error" not in fields:
+        values["error"] = None
+
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    c = conn.cursor()
+    c.execute("INSERT OR IGNORE INTO video_jobs (external_id) VALUES (?)", (external_id,))
+    if values:
+        assignments = ", ".join(f"{key}=?" for key in values)
+        c.execute(f"UPDATE video_jobs SET {assignments}, updated_at=CURRENT_TIMESTAMP WHERE external_id=?",
+                  (*values.values(), external_id))
+    conn.commit()
+    conn.close()
+
+
+def claim_job(external_id: str, owner: str, video_url: str = None, ttl: int = JOB_LEASE_SECONDS) -> bool:
+    """
+    Claim (or renew) the lease of a job, so only one worker ingests a video at a time.
+
+    The claim is a single conditional UPDATE, so two workers racing for the same job
+    (e.g. the startup resume and a new upload of the same URL) cannot both win.
+
+    Args:
+        external_id (str): Video ID from `url_to_id`.
+        owner (str): Unique ID of the claiming worker.
+        video_url (str, optional): Stored if the job does not exist yet.
+        ttl (int): Seconds until the lease expires unless renewed.
+
+    Returns:
+        bool: True if `owner` holds the lease now, False if another worker holds it.
+    """
+    init_jobs_db()
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    c = conn.cursor()
+    c.execute("INSERT OR IGNORE INTO video_jobs (external_id, video_url) VALUES (?, ?)", (external_id, video_url))
+    c.execute(
+        "UPDATE video_jobs SET lease_owner=?, lease_until=datetime('now', ?) "
+        "WHERE external_id=? AND (lease_owner IS NULL OR lease_owner=? OR lease_until < datetime('now'))",
+        (owner, f"+{int(ttl)} seconds", external_id, owner),
+    )
+    claimed = c.rowcount == 1
+    conn.commit()
+    conn.close()
+    return claimed
+
+
+def release_job(external_id: str, owner: str):
+    """Release the lease of a job, if `owner` still holds it."""
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    conn.execute(
+        "UPDATE video_jobs SET lease_owner=NULL, lease_until=NULL WHERE external_id=? AND lease_owner=?",
+        (external_id, owner),
+    )
+    conn.commit()
+    conn.close()
+
+
+@contextmanager
+def job_lease(external_id: str, video_url: str = None, ttl: int = JOB_LEASE_SECONDS):
+    """
+    Hold the lease of a job for the duration of a `with` block, renewing it in the background.
+
+    Yields:
+        bool: Whether the lease was claimed; if False another worker is ingesting the video.
+    """
+    owner = str(uuid.uuid4())
+    if not claim_job(external_id, owner, video_url, ttl):
+        yield False
+        return
+
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(ttl / 3):
+            try:
+                claim_job(external_id, owner, ttl=ttl)
+            except sqlite3.Error as e:
+                print(f"⚠️ Skip renew lease {external_id} karena error: {e}")
+
+    renewer = threading.Thread(target=renew, name=f"lease-{external_id}", daemon=True)
+    renewer.start()
+    try:
+        yield True
+    finally:
+        stop.set()
+        renewer.join()
+        release_job(external_id, owner)
+
+
+def get_pending_jobs() -> list:
+    """
+    Return all jobs that were started but are not done, oldest first.
+
+    Includes jobs without a status, which failed before their Twelve Labs task was created.
+    Every job has a "leased" flag, set while a worker holds its lease.
+    """
+    init_jobs_db()
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(
+        "SELECT *, (lease_until IS NOT NULL AND lease_until >= datetime('now')) AS leased "
+        "FROM video_jobs WHERE status IS NULL OR status != 'done' ORDER BY created_at"
+    ).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def save_clip_text(external_id: str, clip_index: int, start: float, end: float, extracted_text: str):
+    """Checkpoint the slide descriptions of one clip."""
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    conn.execute(
+        "INSERT OR REPLACE INTO video_clips (external_id, clip_index, start_offset_sec, end_offset_sec, extracted_text) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (external_id, clip_index, start, end, extracted_text),
+    )
+    conn.commit()
+    conn.close()
+
+
+def load_clip_texts(external_id: str) -> dict:
+    """
+    Return the checkpointed slide descriptions of a video.
+
+    Returns:
+        dict: (start_offset_sec, end_offset_sec, clip_index) -> extracted text.
+    """
+    init_jobs_db()
+    conn = sqlite3.connect(VIDEO_JOBS_DB)
+    rows = conn.execute(
+        "SELECT clip_index, start_offset_sec, end_offset_sec, extracted_text FROM video_clips WHERE external_id=?",
+        (external_id,),
+    ).fetchall()
+    conn.close()
+    return {(start, end, clip_index): text for clip_index, start, end, text in rows}
@@ -0,0 +1,46 @@
+import os
+import json
+import datetime
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Version of the knowledge base, bumped after every ingest; cached answers of older versions are stale
+KB_VERSION_FILE = os.getenv("KB_VERSION_FILE", "data/registry/kb_version.json")
+
+_lock = threading.Lock()
+
+def get_kb_version() -> int:
+    """Return the current knowledge base version (0 if nothing has been ingested yet)."""
+    if os.path.exists(KB_VERSION_FILE):
+        with open(KB_VERSION_FILE, "r", encoding="utf-8") as f:
+            try:
+                return int(json.load(f).get("version", 0))
+            except (json.JSONDecodeError, ValueError):
+                return 0
+    return 0
+
+def bump_kb_version(job_id: str = None) -> int:
+    """
+    Mark the knowledge base as changed.
+
+    Called once at the end of every ingest path (Cognee and video pipelines, image uploads),
+    so answers cached for an older version are no longer served.
+
+    Args:
+        job_id (str, optional): Ingest job or source that changed the knowledge base, kept for reference.
+
+    Returns:
+        int: The new knowledge base version.
+    """
+    with _lock:
+        version = get_kb_version() + 1
+        os.makedirs(os.path.dirname(KB_VERSION_FILE) or ".", exist_ok=True)
+        with open(KB_VERSION_FILE, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": version,
+                "job_id": job_id,
+                "updated_at": datetime.datetime.now().isoformat(),
+            }, f, indent=2)
+    return version
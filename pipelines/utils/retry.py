@@ -0,0 +1,56 @@
+import time
+import random
+
+# HTTP status codes that are worth retrying (rate limit and transient server errors)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError", "TooManyRequests", "ServiceUnavailable", "ResponseHandlingException"}
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Check whether an API error is a rate limit or a transient failure.
+
+    Args:
+        error (Exception): Error raised by an OpenAI, GCS or Qdrant client call.
+
+    Returns:
+        bool: True if the call should be retried.
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status in RETRYABLE_STATUS_CODES or type(error).__name__ in RETRYABLE_ERRORS
+
+def get_retry_after(error: Exception):
+    """Read the `Retry-After` header (in seconds) from an API error, if the server sent one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def retry_with_backoff(func, *args, retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0, **kwargs):
+    """
+    Call a function, retrying rate-limited and transient failures with exponential backoff.
+
+    The wait doubles on every attempt (with jitter), and a `Retry-After` header from
+    the server takes precedence. Non-retryable errors are raised immediately.
+
+    Args:
+        func (callable): Function to call.
+        *args: Positional arguments for `func`.
+        retries (int): Maximum number of retries after the first attempt.
+        base_delay (float): Wait before the first retry, in seconds.
+        max_delay (float): Upper bound for a single wait, in seconds.
+        **kwargs: Keyword arguments for `func`.
+
+    Returns:
+        Any: The return value of `func`.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == retries or not is_retryable_error(e):
+                raise
+            delay = get_retry_after(e) or min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Retry {attempt + 1}/{retries} in {delay:.1f}s after error: {e}")
+            time.sleep(delay)
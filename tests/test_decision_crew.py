@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("crewai")
+pytest.importorskip("cognee")
+
+from agents.src.decision_crew.crew import DecisionCrew
+from agents.src.decision_crew.streaming import unregister_stream
+
+def test_reporting_task_uses_streaming_llm():
+    decision_crew = DecisionCrew(stream_callback=lambda text: None)
+    try:
+        crew = decision_crew.crew()
+        # Sequential process: research_task, then reporting_task
+        reporting_task = crew.tasks[-1]
+        assert decision_crew.report_llm is not None
+        assert decision_crew.report_llm.stream
+        assert reporting_task.agent.llm is decision_crew.report_llm
+    finally:
+        if decision_crew.report_llm is not None:
+            unregister_stream(decision_crew.report_llm)
+
+def test_reporting_task_without_stream_callback_does_not_stream():
+    decision_crew = DecisionCrew()
+    crew = decision_crew.crew()
+    assert decision_crew.report_llm is None
+    assert not getattr(crew.tasks[-1].agent.llm, "stream", False)
@@ -0,0 +1,24 @@
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from pipelines.qdrant.qdrant_utils import PUBLIC_PAYLOAD, QdrantBatchWriter, create_collection_if_not_exists, has_sparse_vectors
+
+def test_search_results_do_not_expose_payload_hash():
+    client = QdrantClient(":memory:")
+    create_collection_if_not_exists("videos", vector_size=4, sparse=False, client=client)
+    with QdrantBatchWriter("videos", client=client, skip_unchanged=True) as writer:
+        writer.add(PointStruct(id=1, vector=[1.0, 0.0, 0.0, 0.0], payload={"url": "gs://bucket/a.mp4", "start_offset_sec": 0.0}))
+
+    stored = client.retrieve("videos", ids=[1], with_payload=True)[0].payload
+    assert "payload_hash" in stored
+
+    points = client.query_points("videos", query=[1.0, 0.0, 0.0, 0.0], with_payload=PUBLIC_PAYLOAD, limit=1).points
+    assert points[0].payload == {"url": "gs://bucket/a.mp4", "start_offset_sec": 0.0}
+
+def test_collection_caches_are_per_client():
+    dense_only, hybrid = QdrantClient(":memory:"), QdrantClient(":memory:")
+    create_collection_if_not_exists("videos", vector_size=4, sparse=False, client=dense_only)
+    create_collection_if_not_exists("videos", vector_size=4, sparse=True, client=hybrid)
+
+    assert not has_sparse_vectors("videos", dense_only)
+    assert has_sparse_vectors("videos", hybrid)
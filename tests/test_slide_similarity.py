@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+import pytest
+from skimage.metrics import structural_similarity
+
+from pipelines.twelve_labs.slide_similarity import HASH_MATCH_DISTANCE, SlideComparator, dhash, hamming, make_signature, ssim_batch, to_stack
+
+def synthetic_frames(seed: int, shape=(180, 320)):
+    """Blurred grayscale frames like `preprocess_frame` produces: noise, a gradient and a slide."""
+    rng = np.random.default_rng(seed)
+    h, w = shape
+    noise = rng.integers(0, 256, size=shape, dtype=np.uint8)
+    gradient = np.tile(np.linspace(0, 255, w, dtype=np.float32), (h, 1)).astype(np.uint8)
+    slide = np.full(shape, 255, dtype=np.uint8)
+    cv2.rectangle(slide, (0, 0), (w, h // 8), 60, -1)
+    for i in range(4):
+        cv2.putText(slide, f"bullet {seed}-{i}", (10, 50 + 30 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 20, 2)
+    return [cv2.GaussianBlur(frame, (21, 21), 0) for frame in (noise, gradient, slide)]
+
+def lecture_slide(bullets, seed: int = 0, noise: float = 0.0):
+    """Blurred 720p slide sharing one layout with every other call; `noise` adds sensor noise."""
+    slide = np.full((720, 1280), 250, dtype=np.uint8)
+    cv2.rectangle(slide, (0, 0), (1280, 90), 60, -1)
+    cv2.putText(slide, "Organisasi Komputer", (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 255, 3)
+    for i, text in enumerate(bullets):
+        cv2.putText(slide, f"- {text}", (80, 170 + 70 * i), cv2.FONT_HERSHEY_SIMPLEX, 1.1, 20, 2)
+    if noise:
+        rng = np.random.default_rng(seed)
+        slide = np.clip(slide + rng.normal(0, noise, slide.shape), 0, 255).astype(np.uint8)
+    return cv2.GaussianBlur(slide, (21, 21), 0)
+
+@pytest.mark.parametrize("shape", [(180, 320), (97, 131)])
+def test_ssim_batch_matches_skimage(shape):
+    a = synthetic_frames(0, shape)
+    b = synthetic_frames(1, shape)
+    # Identical, unrelated and slightly changed pairs
+    pairs = list(zip(a, a)) + list(zip(a, b)) + [(a[2], cv2.add(a[2], 3))]
+
+    expected = [structural_similarity(x, y) for x, y in pairs]
+    scores = ssim_batch(to_stack([x for x, _ in pairs]), to_stack([y for _, y in pairs]))
+
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-6)
+
+def test_ssim_batch_broadcasts_one_query_against_many():
+    query = synthetic_frames(0)[2]
+    saved = synthetic_frames(1) + synthetic_frames(2)
+
+    expected = [structural_similarity(query, frame) for frame in saved]
+    scores = ssim_batch(to_stack([query]), to_stack(saved))
+
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-6)
+
+def test_dhash_margin_ignores_background_noise():
+    bullets = ["memori cache", "register prosesor", "bus alamat"]
+    clean = dhash(lecture_slide(bullets))
+    noisy = [dhash(lecture_slide(bullets, seed, noise=5)) for seed in range(5)]
+
+    assert max(hamming(clean, h) for h in noisy) <= 4
+
+def test_hash_match_is_confirmed_before_merging_slides():
+    first = make_signature(lecture_slide(["memori cache", "register prosesor", "bus alamat data", "instruksi pipeline", "hazard cabang"]))
+    same = make_signature(lecture_slide(["memori cache", "register prosesor", "bus alamat data", "instruksi pipeline", "hazard cabang"], seed=1, noise=3))
+    other = make_signature(lecture_slide(["interupsi sistem", "alamat memori", "prosesor cache", "data register bus", "cabang instruksi"]))
+    # Same layout, different text: the hashes alone would call this a match
+    assert hamming(first.hash, other.hash) <= HASH_MATCH_DISTANCE
+
+    comparator = SlideComparator()
+    assert not comparator.is_change(first, same)
+    comparator.add(first)
+    assert comparator.is_duplicate(same)
+    assert not comparator.is_duplicate(other)
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+import pytest
+
+from pipelines.twelve_labs import video_jobs
+
+@pytest.fixture(autouse=True)
+def jobs_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_jobs, "VIDEO_JOBS_DB", str(tmp_path / "video_jobs.db"))
+
+def test_only_one_worker_claims_a_job():
+    assert video_jobs.claim_job("vid", "resume", "http://v")
+    assert not video_jobs.claim_job("vid", "upload", "http://v")
+    # Renewing by the holder succeeds
+    assert video_jobs.claim_job("vid", "resume")
+    assert video_jobs.get_pending_jobs()[0]["leased"]
+
+    video_jobs.release_job("vid", "resume")
+    assert not video_jobs.get_pending_jobs()[0]["leased"]
+    assert video_jobs.claim_job("vid", "upload")
+
+def test_expired_lease_can_be_taken_over():
+    assert video_jobs.claim_job("vid", "crashed", "http://v", ttl=1)
+    time.sleep(2.1)
+    assert video_jobs.claim_job("vid", "resume")
+
+def test_job_lease_holds_until_the_block_ends():
+    with video_jobs.job_lease("vid", "http://v") as claimed:
+        assert claimed
+        with video_jobs.job_lease("vid", "http://v") as second:
+            assert not second
+    with video_jobs.job_lease("vid", "http://v") as claimed:
+        assert claimed
+
+def test_job_lease_is_renewed_while_held():
+    with video_jobs.job_lease("vid", "http://v", ttl=1) as claimed:
+        assert claimed
+        time.sleep(2.1)
+        assert not video_jobs.claim_job("vid", "upload")
+
+def test_init_adds_lease_columns_to_old_databases():
+    conn = sqlite3.connect(video_jobs.VIDEO_JOBS_DB)
+    conn.execute("CREATE TABLE video_jobs (external_id TEXT PRIMARY KEY, video_url TEXT, status TEXT, index_id TEXT, "
+                 "task_id TEXT, video_id TEXT, error TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)")
+    conn.execute("INSERT INTO video_jobs (external_id, video_url) VALUES ('old', 'http://old')")
+    conn.commit()
+    conn.close()
+
+    assert video_jobs.claim_job("old", "resume")
+    assert video_jobs.get_job("old")["lease_owner"] == "resume"